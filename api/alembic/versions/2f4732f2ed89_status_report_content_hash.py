@@ -0,0 +1,25 @@
+"""Add content_hash to status_report
+
+Revision ID: 2f4732f2ed89
+Revises: 649e1d593b80
+Create Date: 2026-10-17 10:48:20.114963
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f4732f2ed89'
+down_revision = '649e1d593b80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows start with NULL and get their hash on the next worker run
+    op.add_column('status_report', sa.Column('content_hash', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('status_report', 'content_hash')
@@ -0,0 +1,50 @@
+"""Add the status_summary rollup
+
+Revision ID: 3b8d5f0e6a19
+Revises: 7c1e9a4d2b56
+Create Date: 2026-10-17 15:02:44.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8d5f0e6a19'
+down_revision = '7c1e9a4d2b56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'status_summary',
+        sa.Column('facility_id', sa.String(), nullable=False),
+        sa.Column('status_type', sa.String(), nullable=False),
+        sa.Column('report_count', sa.Integer(), nullable=False),
+        sa.Column('open_count', sa.Integer(), nullable=False),
+        sa.Column('active_count', sa.Integer(), nullable=False),
+        sa.Column('as_of', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('next_change', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('facility_id', 'status_type')
+    )
+    op.create_index(op.f('ix_status_summary_next_change'), 'status_summary', ['next_change'], unique=False)
+    # Same rollup as worker/summary.py, so existing rows are counted before the next ingest
+    op.execute(sa.text("""
+        INSERT INTO status_summary
+            (facility_id, status_type, report_count, open_count, active_count, as_of, next_change)
+        SELECT facility_id, status_type, count(*),
+               count(CASE WHEN end_time IS NULL THEN 1 END),
+               count(CASE WHEN start_time <= CURRENT_TIMESTAMP
+                           AND (end_time IS NULL OR end_time > CURRENT_TIMESTAMP) THEN 1 END),
+               CURRENT_TIMESTAMP,
+               min(CASE WHEN start_time > CURRENT_TIMESTAMP THEN start_time
+                        WHEN end_time > CURRENT_TIMESTAMP THEN end_time END)
+        FROM status_report
+        GROUP BY facility_id, status_type
+    """))
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_status_summary_next_change'), table_name='status_summary')
+    op.drop_table('status_summary')
@@ -0,0 +1,143 @@
+"""Range-partition status_report by start_time, one partition per month
+
+Revision ID: 5e0a7b3c9d14
+Revises: 9d2c4e7f1a83
+Create Date: 2026-10-17 18:05:31.447620
+
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0a7b3c9d14'
+down_revision = '9d2c4e7f1a83'
+branch_labels = None
+depends_on = None
+
+# Months created past the current one, the worker adds later ones as rows arrive
+PREMADE_MONTHS = 3
+
+VALIDITY = "tstzrange(start_time, CASE WHEN end_time < start_time THEN start_time ELSE end_time END, '[)')"
+COLUMNS = "report_id, facility_id, status_type, start_time, end_time, raw_notam_text, content_hash, last_updated"
+INDEXES = [
+    "CREATE INDEX ix_status_report_report_id ON status_report (report_id)",
+    "CREATE INDEX ix_status_report_facility_id ON status_report (facility_id)",
+    "CREATE INDEX ix_status_report_facility_start ON status_report (facility_id, start_time)",
+    "CREATE INDEX ix_status_report_open ON status_report (start_time) WHERE end_time IS NULL",
+    "CREATE INDEX ix_status_report_end_time ON status_report (end_time)",
+    "CREATE INDEX ix_status_report_validity ON status_report USING gist (validity)",
+]
+INDEX_NAMES = [statement.split()[2] for statement in INDEXES]
+
+
+def months(first, last):
+    year, month = first
+    while (year, month) <= last:
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def bounds(month):
+    year, month = month
+    start = datetime.datetime(year, month, 1, tzinfo=datetime.timezone.utc)
+    end = datetime.datetime(year + 1, 1, 1, tzinfo=datetime.timezone.utc) if month == 12 else \
+        datetime.datetime(year, month + 1, 1, tzinfo=datetime.timezone.utc)
+    return start.isoformat(), end.isoformat()
+
+
+def retire_table(old_name):
+    # Frees the names of the live table's constraints, indexes and sequence for the new one
+    bind = op.get_bind()
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('status_report', 'report_id')")).scalar()
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute(f"ALTER TABLE status_report RENAME TO {old_name}")
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT status_report_pkey TO {old_name}_pkey")
+    op.execute(f"ALTER TABLE {old_name} DROP CONSTRAINT uq_status_report_natural_key")
+    for name in INDEX_NAMES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    return sequence
+
+
+def upgrade() -> None:
+    # Declarative partitioning is PostgreSQL only, elsewhere status_report stays a plain table
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # The partition key is part of the primary key, so it cannot be NULL
+    missing = bind.execute(sa.text("SELECT count(*) FROM status_report WHERE start_time IS NULL")).scalar()
+    if missing:
+        raise RuntimeError(f"{missing} status_report rows have no start_time, fix or delete them first")
+
+    sequence = retire_table('status_report_unpartitioned')
+    op.execute(f"""
+        CREATE TABLE status_report (
+            report_id integer NOT NULL DEFAULT nextval('{sequence}'),
+            facility_id varchar NOT NULL,
+            status_type varchar NOT NULL,
+            start_time timestamptz NOT NULL,
+            end_time timestamptz,
+            raw_notam_text varchar,
+            content_hash varchar(32),
+            last_updated timestamptz DEFAULT now(),
+            validity tstzrange GENERATED ALWAYS AS ({VALIDITY}) STORED,
+            CONSTRAINT status_report_pkey PRIMARY KEY (report_id, start_time),
+            CONSTRAINT uq_status_report_natural_key UNIQUE (facility_id, status_type, start_time)
+        ) PARTITION BY RANGE (start_time)
+    """)
+    for statement in INDEXES:
+        op.execute(statement)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    oldest, newest = bind.execute(
+        sa.text("SELECT min(start_time), max(start_time) FROM status_report_unpartitioned")
+    ).one()
+    oldest = (oldest or now).astimezone(datetime.timezone.utc)
+    newest = (newest or now).astimezone(datetime.timezone.utc)
+    last = (now.year + (now.month + PREMADE_MONTHS - 1) // 12, (now.month + PREMADE_MONTHS - 1) % 12 + 1)
+    # There is no default partition: every month holding a row, future-dated NOTAMs and
+    # outages included, must exist before the copy below. Months between them are empty
+    # but cheap, and the worker would create them as rows arrive anyway
+    first = min((oldest.year, oldest.month), (now.year, now.month))
+    for month in months(first, max(last, (newest.year, newest.month))):
+        start, end = bounds(month)
+        op.execute(
+            f"CREATE TABLE status_report_p{month[0]:04d}_{month[1]:02d} PARTITION OF status_report "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+
+    op.execute(f"INSERT INTO status_report ({COLUMNS}) SELECT {COLUMNS} FROM status_report_unpartitioned")
+    op.execute("DROP TABLE status_report_unpartitioned")
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY status_report.report_id")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    sequence = retire_table('status_report_partitioned')
+    op.execute(f"""
+        CREATE TABLE status_report (
+            report_id integer NOT NULL DEFAULT nextval('{sequence}'),
+            facility_id varchar NOT NULL,
+            status_type varchar NOT NULL,
+            start_time timestamptz,
+            end_time timestamptz,
+            raw_notam_text varchar,
+            content_hash varchar(32),
+            last_updated timestamptz DEFAULT now(),
+            validity tstzrange GENERATED ALWAYS AS ({VALIDITY}) STORED,
+            CONSTRAINT status_report_pkey PRIMARY KEY (report_id),
+            CONSTRAINT uq_status_report_natural_key UNIQUE (facility_id, status_type, start_time)
+        )
+    """)
+    for statement in INDEXES:
+        op.execute(statement)
+    op.execute(f"INSERT INTO status_report ({COLUMNS}) SELECT {COLUMNS} FROM status_report_partitioned")
+    # Drops every partition with it
+    op.execute("DROP TABLE status_report_partitioned")
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY status_report.report_id")
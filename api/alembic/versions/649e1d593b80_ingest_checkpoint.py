@@ -0,0 +1,33 @@
+"""Add ingest_checkpoint table
+
+Revision ID: 649e1d593b80
+Revises: abc8a4c3a99f
+Create Date: 2026-10-17 10:03:55.817342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '649e1d593b80'
+down_revision = 'abc8a4c3a99f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ingest_checkpoint',
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('mtime_ns', sa.BigInteger(), nullable=True),
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('byte_offset', sa.BigInteger(), nullable=False),
+    sa.Column('last_updated', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ingest_checkpoint')
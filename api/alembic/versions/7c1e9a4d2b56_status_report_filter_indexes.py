@@ -0,0 +1,33 @@
+"""Add status_report indexes for the list endpoint filters
+
+Revision ID: 7c1e9a4d2b56
+Revises: 2f4732f2ed89
+Create Date: 2026-10-17 13:21:07.402518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e9a4d2b56'
+down_revision = '2f4732f2ed89'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_status_report_facility_start', 'status_report', ['facility_id', 'start_time'], unique=False)
+    # now() is not immutable, so "currently active" is served by a partial index on the
+    # open-ended rows plus a plain end_time index for the rest
+    op.create_index(
+        'ix_status_report_open', 'status_report', ['start_time'], unique=False,
+        postgresql_where=sa.text('end_time IS NULL'), sqlite_where=sa.text('end_time IS NULL')
+    )
+    op.create_index('ix_status_report_end_time', 'status_report', ['end_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_status_report_end_time', table_name='status_report')
+    op.drop_index('ix_status_report_open', table_name='status_report')
+    op.drop_index('ix_status_report_facility_start', table_name='status_report')
@@ -0,0 +1,36 @@
+"""Add a generated validity range with a GiST index to status_report
+
+Revision ID: 9d2c4e7f1a83
+Revises: 3b8d5f0e6a19
+Create Date: 2026-10-17 16:40:12.905113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2c4e7f1a83'
+down_revision = '3b8d5f0e6a19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # tstzrange and GiST are PostgreSQL only, other databases query start_time/end_time directly.
+    # A NULL end_time is an unbounded range; an end before the start gives an empty one
+    # instead of an error
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        "ALTER TABLE status_report ADD COLUMN IF NOT EXISTS validity tstzrange GENERATED ALWAYS AS "
+        "(tstzrange(start_time, CASE WHEN end_time < start_time THEN start_time ELSE end_time END, '[)')) STORED"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_status_report_validity ON status_report USING gist (validity)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_status_report_validity")
+    op.execute("ALTER TABLE status_report DROP COLUMN IF EXISTS validity")
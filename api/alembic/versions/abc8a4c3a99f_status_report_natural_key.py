@@ -0,0 +1,36 @@
+"""Add natural key unique constraint to status_report
+
+Revision ID: abc8a4c3a99f
+Revises: 48043aaf735b
+Create Date: 2026-10-17 09:12:41.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'abc8a4c3a99f'
+down_revision = '48043aaf735b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Older worker runs could insert the same record twice, keep the newest row per natural key
+    op.execute(
+        "DELETE FROM status_report "
+        "WHERE start_time IS NOT NULL AND report_id NOT IN ("
+        "SELECT MAX(report_id) FROM status_report "
+        "GROUP BY facility_id, status_type, start_time)"
+    )
+    with op.batch_alter_table('status_report') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_status_report_natural_key',
+            ['facility_id', 'status_type', 'start_time']
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('status_report') as batch_op:
+        batch_op.drop_constraint('uq_status_report_natural_key', type_='unique')
@@ -0,0 +1,36 @@
+"""Add a generated tsvector with a GIN index for full-text search over raw_notam_text
+
+Revision ID: b61f0d8e2c47
+Revises: 5e0a7b3c9d14
+Create Date: 2026-10-17 19:48:03.271946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b61f0d8e2c47'
+down_revision = '5e0a7b3c9d14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # tsvector and GIN are PostgreSQL only, other databases fall back to LIKE.
+    # 'simple' only lowercases: NOTAM contractions (WIP, OBST, ILS) must not be stemmed.
+    # On the partitioned table both cascade to every partition
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        "ALTER TABLE status_report ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(raw_notam_text, ''))) STORED"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_status_report_search ON status_report USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_status_report_search")
+    op.execute("ALTER TABLE status_report DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,117 @@
+"""Retag NOTAMs stored as status_type 'NOTAM' with their subject's status type
+
+Revision ID: d4a7c2e91f35
+Revises: b61f0d8e2c47
+Create Date: 2026-10-18 09:21:37.504118
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7c2e91f35'
+down_revision = 'b61f0d8e2c47'
+branch_labels = None
+depends_on = None
+
+# worker/notams.py's subject mapping when this revision was written. The parser
+# now derives status_type from the subject, and status_type is part of the
+# natural key, so rows stored under 'NOTAM' by older workers would never be
+# matched again: the next ingest adds the same NOTAM a second time, and the old
+# open-ended (UFN/PERM) rows would stay active forever
+NOTAM_SUBJECTS = {
+    'RWY': 'NOTAM_RUNWAY',
+    'TWY': 'NOTAM_TAXIWAY',
+    'APRON': 'NOTAM_APRON',
+    'AD': 'NOTAM_AERODROME',
+    'ILS': 'NOTAM_NAVAID',
+    'LOC': 'NOTAM_NAVAID',
+    'GS': 'NOTAM_NAVAID',
+    'VOR': 'NOTAM_NAVAID',
+    'VORTAC': 'NOTAM_NAVAID',
+    'DME': 'NOTAM_NAVAID',
+    'NDB': 'NOTAM_NAVAID',
+    'NAV': 'NOTAM_NAVAID',
+    'OBST': 'NOTAM_OBSTRUCTION',
+    'COM': 'NOTAM_COMMUNICATION',
+    'SVC': 'NOTAM_SERVICE',
+    'AIRSPACE': 'NOTAM_AIRSPACE',
+}
+LEGACY_STATUS_TYPE = 'NOTAM'
+
+SUBJECT_PATTERN = '|'.join(sorted(NOTAM_SUBJECTS, key=len, reverse=True))
+# The parser's subject is the first subject keyword after the facility
+FACILITY_RE = re.compile(r"\([A-Z0-9]{3,4}\)|\bA\)\s*[A-Z]{4}\b")
+SUBJECT_RE = re.compile(r"(?<![A-Z0-9/:])(?:" + SUBJECT_PATTERN + r")\b(?!:)")
+
+# Same rollup as worker/summary.py
+SUMMARY_SQL = """
+    INSERT INTO status_summary
+        (facility_id, status_type, report_count, open_count, active_count, as_of, next_change)
+    SELECT facility_id, status_type, count(*),
+           count(CASE WHEN end_time IS NULL THEN 1 END),
+           count(CASE WHEN start_time <= CURRENT_TIMESTAMP
+                       AND (end_time IS NULL OR end_time > CURRENT_TIMESTAMP) THEN 1 END),
+           CURRENT_TIMESTAMP,
+           min(CASE WHEN start_time > CURRENT_TIMESTAMP THEN start_time
+                    WHEN end_time > CURRENT_TIMESTAMP THEN end_time END)
+    FROM status_report
+    GROUP BY facility_id, status_type
+"""
+
+
+def subject_status_type(text):
+    text = text or ''
+    facility = FACILITY_RE.search(text)
+    subject = SUBJECT_RE.search(text, facility.end() if facility else 0)
+    return NOTAM_SUBJECTS[subject.group()] if subject else None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    report = sa.table(
+        'status_report',
+        sa.column('report_id', sa.Integer), sa.column('facility_id', sa.String),
+        sa.column('status_type', sa.String), sa.column('start_time', sa.DateTime(timezone=True)),
+        sa.column('raw_notam_text', sa.String),
+    )
+    legacy = bind.execute(
+        sa.select(report.c.report_id, report.c.facility_id, report.c.start_time, report.c.raw_notam_text)
+        .where(report.c.status_type == LEGACY_STATUS_TYPE)
+    ).all()
+
+    changed = False
+    for row in legacy:
+        status_type = subject_status_type(row.raw_notam_text)
+        if status_type is None:
+            # No subject, the parser still stores it as 'NOTAM'
+            continue
+        # A worker that already ran the new parser stored the same NOTAM again under its new type
+        duplicate = bind.execute(
+            sa.select(report.c.report_id).where(
+                report.c.facility_id == row.facility_id,
+                report.c.status_type == status_type,
+                report.c.start_time == row.start_time,
+            )
+        ).first()
+        if duplicate is not None:
+            bind.execute(sa.delete(report).where(report.c.report_id == row.report_id))
+        else:
+            # content_hash still covers the old type, the next ingest rewrites the row once
+            bind.execute(
+                sa.update(report).where(report.c.report_id == row.report_id).values(status_type=status_type)
+            )
+        changed = True
+
+    if changed:
+        op.execute("DELETE FROM status_summary")
+        op.execute(sa.text(SUMMARY_SQL))
+
+
+def downgrade() -> None:
+    # The retagged rows are valid under the previous revision too, nothing to undo in the schema.
+    # The older parser would store those NOTAMs under 'NOTAM' again next to them
+    pass
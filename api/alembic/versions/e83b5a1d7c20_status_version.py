@@ -0,0 +1,62 @@
+"""Add the status_version change counter, bumped by triggers on status_report
+
+Revision ID: e83b5a1d7c20
+Revises: d4a7c2e91f35
+Create Date: 2026-10-18 10:42:09.863512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e83b5a1d7c20'
+down_revision = 'd4a7c2e91f35'
+branch_labels = None
+depends_on = None
+
+SQLITE_OPERATIONS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'status_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO status_version (id, version, updated_at) VALUES (1, 0, CURRENT_TIMESTAMP)")
+
+    # Same triggers as common/versioning.py. On the partitioned table a statement trigger
+    # on the parent covers every partition, including the ones attached later
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            CREATE OR REPLACE FUNCTION bump_status_version() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                UPDATE status_version SET version = version + 1, updated_at = clock_timestamp() WHERE id = 1;
+                RETURN NULL;
+            END
+            $$
+        """)
+        op.execute(
+            "CREATE TRIGGER status_report_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON status_report "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_status_version()"
+        )
+    else:
+        for operation in SQLITE_OPERATIONS:
+            op.execute(
+                f"CREATE TRIGGER status_report_version_{operation.lower()} AFTER {operation} ON status_report "
+                f"FOR EACH ROW BEGIN UPDATE status_version SET version = version + 1, "
+                f"updated_at = CURRENT_TIMESTAMP WHERE id = 1; END"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS status_report_version ON status_report")
+        op.execute("DROP FUNCTION IF EXISTS bump_status_version()")
+    else:
+        for operation in SQLITE_OPERATIONS:
+            op.execute(f"DROP TRIGGER IF EXISTS status_report_version_{operation.lower()}")
+    op.drop_table('status_version')
@@ -0,0 +1,76 @@
+"""
+Batch lookups: many report ids and/or facilities resolved in one request.
+
+Ids are fetched with a single IN query and facilities with a single
+windowed query returning at most `per_facility` reports each (lowest
+report_id first). The response is keyed by what was asked for:
+
+    {"reports": {"12": {...}, "13": null},
+     "facilities": {"KDEN": [{...}, ...], "KXXX": []}}
+
+null (or an empty list) marks an id (or facility) that was not found.
+"""
+import os
+
+import orjson
+from sqlalchemy import func, select
+
+from common import models
+from .serialization import KEY_FIELD, columns_for
+
+BATCH_MAX_KEYS = int(os.getenv("API_BATCH_MAX_KEYS", "500"))
+BATCH_PER_FACILITY = int(os.getenv("API_BATCH_PER_FACILITY", "100"))
+
+def split_values(values):
+    # Accepts repeated parameters as well as comma-separated ones
+    return [item.strip() for value in values or () for item in value.split(',') if item.strip()]
+
+def parse_batch_keys(ids=None, facility_ids=None, max_keys=None):
+    """
+    Returns (ids, facility_ids), de-duplicated in request order. Raises
+    ValueError for non-integer ids, an empty request, or more than `max_keys`
+    keys in total.
+    """
+    max_keys = max_keys or BATCH_MAX_KEYS
+    try:
+        ids = list(dict.fromkeys(int(value) for value in split_values(ids)))
+    except ValueError:
+        raise ValueError("ids must be integers")
+    facility_ids = list(dict.fromkeys(split_values(facility_ids)))
+    if not ids and not facility_ids:
+        raise ValueError("Pass ids and/or facility_ids")
+    if len(ids) + len(facility_ids) > max_keys:
+        raise ValueError(f"At most {max_keys} ids and facility_ids per request")
+    return ids, facility_ids
+
+async def lookup_batch(db, names, ids, facility_ids, per_facility=None):
+    """Resolves `ids` and `facility_ids` to the JSON body described above."""
+    per_facility = per_facility or BATCH_PER_FACILITY
+    report = models.StatusReport
+    body = {}
+
+    if ids:
+        key = names.index(KEY_FIELD)
+        found = {row[key]: row for row in (await db.execute(
+            select(*columns_for(names)).where(report.report_id.in_(ids))
+        )).all()}
+        body['reports'] = {
+            str(report_id): dict(zip(names, found[report_id])) if report_id in found else None
+            for report_id in ids
+        }
+
+    if facility_ids:
+        rank = func.row_number().over(partition_by=report.facility_id, order_by=report.report_id)
+        ranked = select(
+            report.facility_id.label('_facility'), rank.label('_rank'), *columns_for(names)
+        ).where(report.facility_id.in_(facility_ids)).subquery()
+        query = select(ranked.c['_facility'], *(ranked.c[name] for name in names)).where(
+            ranked.c['_rank'] <= per_facility
+        ).order_by(ranked.c['_facility'], ranked.c[KEY_FIELD])
+
+        facilities = {facility_id: [] for facility_id in facility_ids}
+        for row in (await db.execute(query)).all():
+            facilities[row[0]].append(dict(zip(names, row[1:])))
+        body['facilities'] = facilities
+
+    return orjson.dumps(body, option=orjson.OPT_UTC_Z)
@@ -0,0 +1,136 @@
+"""
+Conditional GET and an in-process response cache for the status endpoints.
+
+Every request first reads the version of the status_report table: the
+single status_version row, a primary key lookup whatever the table's size,
+bumped by triggers on every write (common/versioning.py). The ETag is
+derived from that version and the request URL, so:
+
+- a client sending a matching If-None-Match (or an If-Modified-Since no older
+  than the table) gets a 304 without any row being fetched;
+- serialized bodies are cached per URL together with the ETag they were
+  built for, and reused only while the table version is unchanged.
+
+Every write gets a new version, ETags never confuse two states. Last-Modified
+comes from status_version.updated_at, which SQLite only keeps to the second.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Response
+from sqlalchemy import select
+
+from common import models
+from common.versioning import VERSION_ROW_ID
+
+RESPONSE_CACHE_SIZE = int(os.getenv("API_RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.getenv("API_RESPONSE_CACHE_TTL", "30"))
+
+class ResponseCache:
+    """Bounded LRU of serialized responses, each entry expiring `ttl` seconds after it was stored."""
+
+    def __init__(self, maxsize=None, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize or RESPONSE_CACHE_SIZE
+        self.ttl = RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Sync callers would run in the thread pool, concurrently with the event loop
+        self.lock = threading.Lock()
+
+    def get(self, key, etag):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != etag or entry[1] <= self.clock():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, etag, value):
+        with self.lock:
+            self.entries[key] = (etag, self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxsize': self.maxsize}
+
+response_cache = ResponseCache()
+
+async def table_version(db):
+    """Returns (version, updated_at) of status_report, (0, None) before the version row exists."""
+    row = models.StatusVersion
+    result = await db.execute(select(row.version, row.updated_at).where(row.id == VERSION_ROW_ID))
+    return result.first() or (0, None)
+
+def as_utc(value):
+    # SQLite hands back naive datetimes for server defaults, which are UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def make_etag(version, request):
+    number, updated_at = version
+    # updated_at tells apart databases that were recreated and count from 0 again
+    stamp = as_utc(updated_at).isoformat() if updated_at else ''
+    key = f"{number}|{stamp}|{request.url.path}|{request.url.query}"
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+def is_not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return as_utc(last_modified).replace(microsecond=0) <= as_utc(since)
+    return False
+
+async def cached_json_response(request, db, build):
+    """
+    Serves a JSON response with ETag/Last-Modified validators. `build()` is a
+    coroutine function returning (body_bytes, extra_headers), awaited only on
+    a cache miss.
+    """
+    version = await table_version(db)
+    etag = make_etag(version, request)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if version[1] is not None:
+        headers['Last-Modified'] = format_datetime(as_utc(version[1]), usegmt=True)
+
+    if is_not_modified(request, etag, version[1]):
+        return Response(status_code=304, headers=headers)
+
+    key = (request.url.path, request.url.query)
+    cached = response_cache.get(key, etag)
+    if cached is None:
+        cached = await build()
+        response_cache.put(key, etag, cached)
+        headers['X-Cache'] = 'MISS'
+    else:
+        headers['X-Cache'] = 'HIT'
+
+    body, extra_headers = cached
+    return Response(content=body, media_type='application/json', headers={**headers, **extra_headers})
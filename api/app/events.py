@@ -0,0 +1,157 @@
+"""
+Server-Sent Events for status report changes.
+
+One ChangeBroadcaster per API process holds a single dedicated asyncpg
+connection LISTENing on STATUS_NOTIFY_CHANNEL (see common.notifications) and
+fans every notification out to the queues of the connected SSE clients,
+filtered by facility. The connection is opened with the first subscriber,
+closed with the last one, and reopened after a delay if it drops.
+
+Events sent to clients:
+
+    event: change   data: {"facility_id": ..., "report_ids": [...] or null}
+    event: reset    data: {}   events may have been missed, refetch the list
+
+A client that falls more than SSE_QUEUE_SIZE events behind gets a reset
+instead of the backlog. Without PostgreSQL there is no LISTEN, and only
+changes published in-process reach the subscribers.
+"""
+import asyncio
+import os
+
+import orjson
+from sqlalchemy.engine import make_url
+
+from common.notifications import STATUS_NOTIFY_CHANNEL, decode_change
+
+SSE_QUEUE_SIZE = int(os.getenv("API_SSE_QUEUE_SIZE", "100"))
+# Seconds between comment lines keeping idle streams open through proxies
+SSE_KEEPALIVE = float(os.getenv("API_SSE_KEEPALIVE", "15"))
+# Seconds before reconnecting a dropped LISTEN connection, also sent as the client retry delay
+LISTEN_RETRY = float(os.getenv("API_LISTEN_RETRY", "3"))
+
+RESET = {'event': 'reset'}
+
+class Subscription:
+    """A client's queue of pending events, with an optional facility filter."""
+
+    def __init__(self, facilities=None, maxsize=None):
+        self.facilities = frozenset(facilities) if facilities else None
+        self.queue = asyncio.Queue(maxsize or SSE_QUEUE_SIZE)
+        self.overflowed = False
+
+    def matches(self, change):
+        return self.facilities is None or change['facility_id'] in self.facilities
+
+    def offer(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog, the client refetches on reset
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+    async def get(self):
+        event = await self.queue.get()
+        if event is RESET:
+            self.overflowed = False
+        return event
+
+class ChangeBroadcaster:
+    def __init__(self, database_url=None, channel=STATUS_NOTIFY_CHANNEL, retry=None):
+        self.database_url = database_url
+        self.channel = channel
+        self.retry = LISTEN_RETRY if retry is None else retry
+        self.subscribers = set()
+        self.task = None
+
+    @property
+    def listens(self):
+        return bool(self.database_url) and make_url(self.database_url).get_backend_name() == 'postgresql'
+
+    def subscribe(self, facilities=None):
+        subscription = Subscription(facilities)
+        self.subscribers.add(subscription)
+        if self.task is None and self.listens:
+            self.task = asyncio.create_task(self.listen())
+        return subscription
+
+    async def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+        if not self.subscribers:
+            await self.stop()
+
+    def publish(self, change):
+        """Delivers a decoded change to every matching subscriber."""
+        event = {'event': 'change', 'data': change}
+        for subscription in self.subscribers:
+            if subscription.matches(change):
+                subscription.offer(event)
+
+    def reset(self):
+        for subscription in self.subscribers:
+            subscription.offer(RESET)
+
+    def on_notification(self, connection, pid, channel, payload):
+        change = decode_change(payload)
+        if change is not None:
+            self.publish(change)
+
+    async def listen(self):
+        import asyncpg
+
+        # asyncpg takes the libpq form of the URL, without the SQLAlchemy driver suffix
+        dsn = make_url(self.database_url).set(drivername='postgresql').render_as_string(hide_password=False)
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self.on_notification)
+                if not first:
+                    # Whatever was committed while disconnected was not seen
+                    self.reset()
+                first = False
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"LISTEN {self.channel} failed: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            first = False
+            await asyncio.sleep(self.retry)
+
+    async def stop(self):
+        task, self.task = self.task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+def format_event(event):
+    return b'event: ' + event['event'].encode() + b'\ndata: ' + orjson.dumps(event.get('data', {})) + b'\n\n'
+
+async def iter_events(broadcaster, subscription, keepalive=None):
+    """Yields the SSE stream of `subscription` until the client goes away."""
+    keepalive = keepalive or SSE_KEEPALIVE
+    try:
+        yield f"retry: {int(broadcaster.retry * 1000)}\n\n".encode()
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        await broadcaster.unsubscribe(subscription)
@@ -0,0 +1,56 @@
+"""
+Streaming bulk export of status reports as NDJSON or CSV.
+
+Rows come from a server-side cursor in partitions of EXPORT_BATCH_SIZE, and
+each partition is encoded and sent before the next one is fetched, so the
+API holds one partition at a time however large the table is.
+"""
+import csv
+import io
+import os
+import zlib
+
+import orjson
+
+EXPORT_BATCH_SIZE = int(os.getenv("API_EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def format_csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        # Same datetime text as the JSON responses
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z)[1:-1].decode()
+    return value
+
+async def iter_ndjson(names, partitions):
+    async for rows in partitions:
+        yield b''.join(
+            orjson.dumps(dict(zip(names, row)), option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+async def iter_csv(names, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    async for rows in partitions:
+        writer.writerows([format_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+async def gzip_stream(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,29 @@
+"""
+Server-side filters shared by the status list endpoints.
+"""
+from common import models
+from common.intervals import active_at as active_at_clause, overlaps
+
+def apply_status_filters(query, facility_id=None, status_type=None, active_at=None,
+                         start_after=None, end_before=None, overlaps_from=None, overlaps_to=None):
+    """
+    Narrows a StatusReport query. `facility_id` and `status_type` take lists
+    (any of), `active_at` keeps reports whose window contains that instant
+    (an open end_time never expires), `overlaps_from`/`overlaps_to` the ones
+    whose window overlaps [from, to) (either may be open), and
+    `start_after`/`end_before` bound the window itself. None means no filter.
+    """
+    report = models.StatusReport
+    if facility_id:
+        query = query.where(report.facility_id.in_(facility_id))
+    if status_type:
+        query = query.where(report.status_type.in_(status_type))
+    if active_at is not None:
+        query = query.where(active_at_clause(active_at))
+    if overlaps_from is not None or overlaps_to is not None:
+        query = query.where(overlaps(overlaps_from, overlaps_to))
+    if start_after is not None:
+        query = query.where(report.start_time >= start_after)
+    if end_before is not None:
+        query = query.where(report.end_time <= end_before)
+    return query
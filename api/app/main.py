@@ -1,35 +1,333 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from contextlib import asynccontextmanager
+import os
+from datetime import datetime, timezone
 
 from common import models, schemas
-from common.database import SessionLocal, engine
+from common.database import DATABASE_URL, get_async_engine, get_async_sessionmaker
+from common.pooling import pool_status
+from common.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render as render_metrics
+from common.search import text_match, text_rank
+from .pagination import MAX_PAGE_SIZE, encode_cursor, decode_cursor, encode_search_cursor, decode_search_cursor, next_page_headers
+from .filters import apply_status_filters
+from .caching import cached_json_response
+from .serialization import KEY_FIELD, parse_fields, columns_for, dump_rows
+from .export import EXPORT_BATCH_SIZE, EXPORT_MEDIA_TYPES, iter_ndjson, iter_csv, gzip_stream
+from .events import ChangeBroadcaster, iter_events
+from .batch import BATCH_PER_FACILITY, parse_batch_keys, lookup_batch
+from .metrics import MetricsMiddleware
 
-# Create tables if they don't exist (useful for simple setups, though alembic is preferred)
-models.Base.metadata.create_all(bind=engine)
+# Fans the worker's change notifications out to the SSE clients of this process
+broadcaster = ChangeBroadcaster(DATABASE_URL)
 
-app = FastAPI(title="Flos API", version="1.0")
+# Create tables if they don't exist (useful for simple setups, though alembic is preferred).
+# Set API_CREATE_SCHEMA=0 where migrations own the schema
+CREATE_SCHEMA = os.getenv("API_CREATE_SCHEMA", "1") not in ('0', 'false', 'no')
+
+async def create_schema():
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+
+@asynccontextmanager
+async def lifespan(app):
+    # At startup rather than at import, so importing the app needs no database
+    if CREATE_SCHEMA:
+        await create_schema()
+    yield
+    await broadcaster.stop()
+
+app = FastAPI(title="Flos API", version="1.0", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 # Dependency
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with get_async_sessionmaker()() as db:
         yield db
-    finally:
-        db.close()
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/internal/pool", include_in_schema=False)
+def read_pool_status():
+    """Connection pool state and checkout/connect statistics of the API's engines."""
+    return pool_status()
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Request, SQL statement, pool and cache metrics in the Prometheus text format."""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/api/v1/status/", response_model=List[schemas.StatusReport])
-def read_status_reports(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    reports = db.query(models.StatusReport).offset(skip).limit(limit).all()
-    return reports
+async def read_status_reports(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    facility_id: Optional[List[str]] = Query(None),
+    status_type: Optional[List[str]] = Query(None),
+    active_at: Optional[datetime] = None,
+    start_after: Optional[datetime] = None,
+    end_before: Optional[datetime] = None,
+    fields: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Lists status reports ordered by report_id. Pass the X-Next-Cursor header of
+    a page as `cursor` to get the next one (`skip` is ignored then); the header
+    is absent on the last page. A `limit` above API_MAX_PAGE_SIZE returns that
+    many rows and the cursor of the rest. `facility_id` and `status_type` can be repeated.
+    `fields` (comma-separated) limits the columns returned, report_id is always
+    included. Supports If-None-Match / If-Modified-Since.
+    """
+    filters = dict(facility_id=facility_id, status_type=status_type, active_at=active_at,
+                   start_after=start_after, end_before=end_before)
+    return await status_page(request, db, fields, cursor, skip, limit, filters)
+
+@app.get("/api/v1/status/active", response_model=List[schemas.StatusReport])
+async def read_active_status_reports(
+    request: Request,
+    at: Optional[datetime] = None,
+    window_from: Optional[datetime] = Query(None, alias='from'),
+    window_to: Optional[datetime] = Query(None, alias='to'),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    facility_id: Optional[List[str]] = Query(None),
+    status_type: Optional[List[str]] = Query(None),
+    fields: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Status reports in effect at `at`, or at any point of the window
+    [`from`, `to`) (either bound may be omitted), where a missing end_time
+    means UFN/PERM. Without any of them, the reports active now. Paginated
+    like the list endpoint; on PostgreSQL both are GiST index lookups.
+    """
+    if at is not None and (window_from is not None or window_to is not None):
+        raise HTTPException(status_code=400, detail="Pass either at or from/to")
+    if window_from is not None and window_to is not None and window_from >= window_to:
+        raise HTTPException(status_code=400, detail="from must be before to")
+    # "Now" moves without the table changing, so that answer is neither cached nor validated
+    cacheable = at is not None or window_from is not None or window_to is not None
+    if not cacheable:
+        at = datetime.now(timezone.utc)
+
+    filters = dict(facility_id=facility_id, status_type=status_type, active_at=at,
+                   overlaps_from=window_from, overlaps_to=window_to)
+    return await status_page(request, db, fields, cursor, 0, limit, filters, cacheable)
+
+@app.get("/api/v1/status/search", response_model=List[schemas.StatusReport])
+async def search_status_reports(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    facility_id: Optional[List[str]] = Query(None),
+    status_type: Optional[List[str]] = Query(None),
+    fields: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search of raw_notam_text. On PostgreSQL `q` takes web search
+    syntax: words (all required), "quoted phrases", OR and -excluded words,
+    matched as whole words ignoring case ("ILS" does not find "FILS"), best
+    matches first. Other databases only match substrings ("RWY" finds "RWYS"),
+    treat OR and quotes as plain words and do not rank. Paginated with
+    X-Next-Cursor like the list endpoint.
+    """
+    limit = min(limit, MAX_PAGE_SIZE)
+    try:
+        names = parse_fields(fields)
+        after = decode_search_cursor(cursor) if cursor is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def build():
+        rank = text_rank(q).label('rank')
+        ranked = select(rank, *columns_for(names)).where(text_match(q))
+        ranked = apply_status_filters(ranked, facility_id, status_type).subquery()
+        query = select(ranked.c['rank'], *(ranked.c[name] for name in names))
+        if after is not None:
+            last_rank, last_id = after
+            query = query.where(
+                (ranked.c['rank'] < last_rank) |
+                ((ranked.c['rank'] == last_rank) & (ranked.c[KEY_FIELD] > last_id))
+            )
+        query = query.order_by(ranked.c['rank'].desc(), ranked.c[KEY_FIELD])
+
+        rows = (await db.execute(query.limit(limit + 1))).all()
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers = next_page_headers(
+                request, encode_search_cursor(rows[-1][0], rows[-1][1 + names.index(KEY_FIELD)])
+            )
+        return dump_rows(names, [row[1:] for row in rows]), headers
+
+    return await cached_json_response(request, db, build)
+
+async def status_page(request, db, fields, cursor, skip, limit, filters, cacheable=True):
+    """One page of status reports ordered by report_id, see read_status_reports."""
+    limit = min(limit, MAX_PAGE_SIZE)
+    try:
+        names = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def build():
+        query = select(*columns_for(names)).order_by(models.StatusReport.report_id)
+        query = apply_status_filters(query, **filters)
+        if after is not None:
+            query = query.where(models.StatusReport.report_id > after)
+        elif skip:
+            query = query.offset(skip)
+
+        # One extra row tells whether another page exists
+        rows = (await db.execute(query.limit(limit + 1))).all()
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers = next_page_headers(request, encode_cursor(rows[-1][names.index(KEY_FIELD)]))
+        return dump_rows(names, rows), headers
+
+    if not cacheable:
+        body, headers = await build()
+        return Response(content=body, media_type='application/json', headers=headers)
+    return await cached_json_response(request, db, build)
+
+SUMMARY_FIELDS = tuple(schemas.StatusSummary.model_fields)
+
+# Declared before /{report_id} so "summary" is not parsed as an id
+@app.get("/api/v1/status/summary", response_model=List[schemas.StatusSummary])
+async def read_status_summary(
+    facility_id: Optional[List[str]] = Query(None),
+    status_type: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Report counts per facility and status_type from the status_summary rollup
+    the worker maintains: all reports, open-ended ones, and the ones active at
+    `as_of` (the last refresh). `next_change` is when the active count next
+    changes by the clock alone. `facility_id` and `status_type` can be repeated.
+    """
+    summary = models.StatusSummary
+    query = select(*(getattr(summary, name) for name in SUMMARY_FIELDS)).order_by(
+        summary.facility_id, summary.status_type
+    )
+    if facility_id:
+        query = query.where(summary.facility_id.in_(facility_id))
+    if status_type:
+        query = query.where(summary.status_type.in_(status_type))
+    rows = (await db.execute(query)).all()
+    return Response(content=dump_rows(SUMMARY_FIELDS, rows), media_type='application/json')
+
+def parse_batch_request(ids, facility_ids, fields):
+    try:
+        return parse_fields(fields), *parse_batch_keys(ids, facility_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Declared before /{report_id} so "batch" is not parsed as an id
+@app.get("/api/v1/status/batch")
+async def read_status_batch(
+    request: Request,
+    ids: Optional[List[str]] = Query(None),
+    facility_ids: Optional[List[str]] = Query(None),
+    fields: Optional[List[str]] = Query(None),
+    per_facility: int = Query(BATCH_PER_FACILITY, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Looks up many reports in one request: `ids` (comma-separated and/or
+    repeated) are returned under "reports" keyed by id, null when not found;
+    `facility_ids` under "facilities", up to `per_facility` reports each.
+    Takes `fields` like the list endpoint. Supports If-None-Match.
+    """
+    names, report_ids, facilities = parse_batch_request(ids, facility_ids, fields)
+
+    async def build():
+        return await lookup_batch(db, names, report_ids, facilities, per_facility), {}
+
+    return await cached_json_response(request, db, build)
+
+@app.post("/api/v1/status/batch")
+async def read_status_batch_post(body: schemas.StatusBatchRequest, db: AsyncSession = Depends(get_db)):
+    """Same lookup as GET /api/v1/status/batch, for id lists too long for a URL."""
+    names, report_ids, facilities = parse_batch_request(
+        [str(report_id) for report_id in body.ids], body.facility_ids, body.fields
+    )
+    body = await lookup_batch(db, names, report_ids, facilities, body.per_facility)
+    return Response(content=body, media_type='application/json')
+
+# Declared before /{report_id} so "stream" is not parsed as an id
+@app.get("/api/v1/status/stream")
+async def stream_status_changes(facility_id: Optional[List[str]] = Query(None)):
+    """
+    Server-Sent Events stream of status report changes: a `change` event with
+    the facility_id and changed report_ids after every ingest that wrote rows
+    (report_ids is null for very large runs), and `reset` when events may have
+    been missed. `facility_id` can be repeated to only receive those facilities.
+    """
+    subscription = broadcaster.subscribe(facility_id)
+    return StreamingResponse(
+        iter_events(broadcaster, subscription),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# Declared before /{report_id} so "export" is not parsed as an id
+@app.get("/api/v1/status/export")
+async def export_status_reports(
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+    gzip: bool = False,
+    facility_id: Optional[List[str]] = Query(None),
+    status_type: Optional[List[str]] = Query(None),
+    active_at: Optional[datetime] = None,
+    start_after: Optional[datetime] = None,
+    end_before: Optional[datetime] = None,
+    fields: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Streams every matching status report, ordered by report_id, as NDJSON or
+    CSV in one response. Takes the same filters and `fields` as the list
+    endpoint; `gzip=true` compresses the stream (Content-Encoding: gzip).
+    """
+    try:
+        names = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    query = select(*columns_for(names)).order_by(models.StatusReport.report_id)
+    query = apply_status_filters(query, facility_id, status_type, active_at, start_after, end_before)
+    # Server-side cursor, fetched EXPORT_BATCH_SIZE rows at a time
+    result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+    encode = iter_csv if format == 'csv' else iter_ndjson
+    body = encode(names, result.partitions())
+    headers = {'Content-Disposition': f'attachment; filename="status_reports.{format}"'}
+    if gzip:
+        body = gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
 
 @app.get("/api/v1/status/{report_id}", response_model=schemas.StatusReport)
-def read_status_report(report_id: int, db: Session = Depends(get_db)):
-    report = db.query(models.StatusReport).filter(models.StatusReport.report_id == report_id).first()
-    if report is None:
-        raise HTTPException(status_code=404, detail="Status report not found")
-    return report
+async def read_status_report(report_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        report = await db.get(models.StatusReport, report_id)
+        if report is None:
+            raise HTTPException(status_code=404, detail="Status report not found")
+        return schemas.StatusReport.model_validate(report).model_dump_json().encode(), {}
+
+    return await cached_json_response(request, db, build)
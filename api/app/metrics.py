@@ -0,0 +1,67 @@
+"""
+Request metrics of the API, served with everything else in common.metrics on /metrics.
+
+MetricsMiddleware times each HTTP request from the moment it reaches the app
+until the last body chunk is sent, so streamed exports and SSE connections
+count for as long as they stay open. Requests are labelled with the route's
+path template (/api/v1/status/{report_id}), never the raw path, and
+anything no route matched shares the 'unmatched' label.
+"""
+import time
+
+from common import metrics
+from .caching import response_cache
+
+HTTP_REQUESTS = metrics.Counter(
+    'http_requests_total', "HTTP requests by route and response status", ('method', 'route', 'status')
+)
+HTTP_REQUEST_SECONDS = metrics.Histogram(
+    'http_request_duration_seconds', "Time to answer an HTTP request, body included",
+    ('method', 'route'), buckets=metrics.LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = metrics.Gauge(
+    'http_requests_in_progress', "HTTP requests being answered", ()
+)
+
+metrics.Callback('api_response_cache_hits_total', "Responses served from the response cache", 'counter',
+                 lambda: {(): response_cache.stats()['hits']})
+metrics.Callback('api_response_cache_misses_total', "Response cache lookups that had to query", 'counter',
+                 lambda: {(): response_cache.stats()['misses']})
+
+def route_label(scope):
+    route = scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: unlike BaseHTTPMiddleware it does not buffer or re-wrap streamed bodies."""
+
+    def __init__(self, app):
+        self.app = app
+        self.in_progress = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        # Reported if the app raises before starting a response
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        self.in_progress += 1
+        HTTP_REQUESTS_IN_PROGRESS.set(self.in_progress)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_progress -= 1
+            HTTP_REQUESTS_IN_PROGRESS.set(self.in_progress)
+            # The router stores the matched route in the shared scope
+            method, route = scope['method'], route_label(scope)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
@@ -0,0 +1,54 @@
+"""
+Keyset pagination for list endpoints.
+
+Pages are ordered on report_id (the primary key), and a cursor encodes the
+last report_id of the previous page. Every page is then an index range scan
+(WHERE report_id > :after ORDER BY report_id LIMIT n), so page N costs the
+same as page 1, and rows the worker inserts meanwhile cannot shift later pages.
+
+Search results are ordered on (rank desc, report_id), their cursors carry
+the rank of the last row as well.
+"""
+import base64
+import binascii
+import json
+import os
+
+CURSOR_VERSION = 1
+# Largest page a list endpoint returns, a larger `limit` is reduced to it and the rest walked with the cursor
+MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+
+def encode_cursor(report_id, **extra):
+    payload = json.dumps({'v': CURSOR_VERSION, 'after': report_id, **extra}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def load_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        after = payload['after']
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if payload.get('v') != CURSOR_VERSION or not isinstance(after, int) or isinstance(after, bool):
+        raise ValueError("Invalid cursor")
+    return payload
+
+def decode_cursor(cursor):
+    """Returns the report_id a cursor points after. Raises ValueError for a malformed cursor."""
+    return load_cursor(cursor)['after']
+
+def encode_search_cursor(rank, report_id):
+    return encode_cursor(report_id, rank=rank)
+
+def decode_search_cursor(cursor):
+    """Returns the (rank, report_id) a search cursor points after. Raises ValueError if malformed."""
+    payload = load_cursor(cursor)
+    rank = payload.get('rank')
+    if not isinstance(rank, (int, float)) or isinstance(rank, bool):
+        raise ValueError("Invalid cursor")
+    return rank, payload['after']
+
+def next_page_headers(request, next_cursor):
+    # The body stays a plain list for existing clients, the cursor travels in headers
+    next_url = request.url.remove_query_params('skip').include_query_params(cursor=next_cursor)
+    return {'X-Next-Cursor': next_cursor, 'Link': f'<{next_url}>; rel="next"'}
@@ -0,0 +1,39 @@
+"""
+Fast JSON path for list responses.
+
+Rows are selected as plain tuples of the requested columns (no ORM objects,
+no per-row Pydantic validation) and encoded with orjson. The output matches
+what schemas.StatusReport would produce for the same columns, including
+"Z"-suffixed UTC datetimes.
+"""
+import orjson
+
+from common import models, schemas
+
+# Response fields in schema order, every one of them is a status_report column
+STATUS_FIELDS = tuple(schemas.StatusReport.model_fields)
+# Always returned, pagination cursors are built from it
+KEY_FIELD = 'report_id'
+
+def parse_fields(fields):
+    """
+    Resolves a `fields=` value (comma-separated and/or repeated) to the
+    response fields in schema order. None selects every field. Raises
+    ValueError for unknown names.
+    """
+    if not fields:
+        return STATUS_FIELDS
+    requested = {name.strip() for value in fields for name in value.split(',') if name.strip()}
+    unknown = requested.difference(STATUS_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add(KEY_FIELD)
+    return tuple(name for name in STATUS_FIELDS if name in requested)
+
+def columns_for(names):
+    table = models.StatusReport.__table__
+    return [table.c[name] for name in names]
+
+def dump_rows(names, rows):
+    """Encodes row tuples as a JSON array of objects keyed by `names`."""
+    return orjson.dumps([dict(zip(names, row)) for row in rows], option=orjson.OPT_UTC_Z)
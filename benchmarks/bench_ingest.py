@@ -0,0 +1,170 @@
+"""
+Benchmark suite: per-stage worker ingestion throughput and peak memory.
+
+For every size, seeded runway JSON / outage CSV / NOTAM corpora of that many
+records are generated, then each stage runs in its own child process so its
+peak RSS is measured in isolation:
+
+    process_runway_json, process_outage_csv, process_text_notams
+    ingest_data (all three sources) against each --database-url
+
+Results are written as JSON (one entry per stage/size/database with records,
+seconds, records_per_sec and peak_rss_mb) and can be compared against a
+previous baseline with --compare.
+
+Usage: python benchmarks/bench_ingest.py [--sizes 10000 100000 1000000]
+           [--database-url postgresql://localhost/flos_bench] [--output baseline.json]
+           [--compare old_baseline.json]
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# worker_job imports common.database, which needs a DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from benchmarks.generators import write_runway_json, write_outage_csv, synthetic_notams
+
+DEFAULT_SIZES = [10_000, 100_000]
+PARSE_STAGES = ('process_runway_json', 'process_outage_csv', 'process_text_notams')
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_parse_stage(stage, data_dir, size, seed):
+    from worker import worker_job
+
+    if stage == 'process_text_notams':
+        notams = synthetic_notams(size, seed)
+        start = time.perf_counter()
+        records = worker_job.process_text_notams(notams)
+    elif stage == 'process_runway_json':
+        start = time.perf_counter()
+        records = worker_job.process_runway_json(os.path.join(data_dir, 'runway_data.json'))
+    else:
+        start = time.perf_counter()
+        records = worker_job.process_outage_csv(os.path.join(data_dir, 'outage_log.csv'))
+    return len(records), time.perf_counter() - start, peak_rss_mb()
+
+def run_ingest_stage(database_url, data_dir, size, seed):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from common.models import Base
+    from worker import worker_job
+
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    worker_job.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    worker_job.mock_legacy_notams = synthetic_notams(size, seed)
+
+    start = time.perf_counter()
+    result = worker_job.ingest_data(force=True, data_dir=data_dir)
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return result['added'] + result['updated'] + result['unchanged'], elapsed, peak_rss_mb()
+
+def in_child(fn, *args):
+    # A fresh spawned process per stage, so peak RSS is not inherited from earlier stages
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(fn, *args).result()
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def redact(database_url):
+    # Keep the backend and database name, drop credentials and host
+    scheme, _, rest = database_url.partition('://')
+    return f"{scheme}://.../{rest.rsplit('/', 1)[-1]}" if '/' in rest else database_url
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {
+            (r['stage'], r['size'], r['database']): r for r in json.load(f)['results']
+        }
+    print(f"\nComparison against {baseline_path} (records/sec, >1.00x is faster):")
+    for r in results:
+        old = baseline.get((r['stage'], r['size'], r['database']))
+        if old:
+            ratio = r['records_per_sec'] / old['records_per_sec'] if old['records_per_sec'] else float('inf')
+            print(f"  {r['stage']:<20} {r['size']:>9} {r['database']:<24} {ratio:5.2f}x"
+                  f"  rss {old['peak_rss_mb']:.0f} -> {r['peak_rss_mb']:.0f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument("--database-url", action='append', dest='database_urls',
+                        help="database for the ingest_data stage, repeatable (default: a temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=os.path.join(project_root, 'benchmarks', 'ingest_baseline.json'))
+    parser.add_argument("--compare", help="previous baseline JSON to compare against")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        database_urls = args.database_urls or [f"sqlite:///{os.path.join(tmp, 'bench.db')}"]
+
+        for size in args.sizes:
+            data_dir = os.path.join(tmp, str(size))
+            os.makedirs(data_dir)
+            print(f"Generating {size} records per source...")
+            write_runway_json(os.path.join(data_dir, 'runway_data.json'), size, args.seed)
+            write_outage_csv(os.path.join(data_dir, 'outage_log.csv'), size, args.seed)
+
+            runs = [(stage, 'none', run_parse_stage, (stage, data_dir, size, args.seed)) for stage in PARSE_STAGES]
+            runs += [('ingest_data', redact(url), run_ingest_stage, (url, data_dir, size, args.seed))
+                     for url in database_urls]
+
+            for stage, database, fn, fn_args in runs:
+                records, seconds, rss = in_child(fn, *fn_args)
+                entry = {
+                    'stage': stage,
+                    'size': size,
+                    'database': 'sqlite' if database.startswith('sqlite') else database,
+                    'records': records,
+                    'seconds': round(seconds, 4),
+                    'records_per_sec': round(records / seconds) if seconds else None,
+                    'peak_rss_mb': round(rss, 1),
+                }
+                results.append(entry)
+                print(f"  {stage:<20} {entry['database']:<24} {records:>9} records  {seconds:8.2f}s  "
+                      f"{entry['records_per_sec'] or 0:>10,} rec/s  {entry['peak_rss_mb']:8.1f} MB")
+
+    report = {
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: single-pass NOTAM scanner vs the original two-regex parser, in messages/sec.
+
+Field extraction is timed on its own as well as end to end, since the end to
+end numbers are dominated by timestamp parsing and the scanner recovers
+start times (UNTIL UFN, EST) that the legacy parser drops.
+
+Usage: python benchmarks/bench_notams.py [--messages 200000]
+"""
+import argparse
+import datetime
+import os
+import re
+import sys
+import time
+from datetime import timezone
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# worker_job imports common.database, which needs a DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from worker.worker_job import process_text_notams
+from worker.notams import scan_notam
+from benchmarks.generators import synthetic_notams
+
+def legacy_parse_notam_effective_time(time_str):
+    if not time_str or len(time_str) < 10:
+        return None
+    try:
+        dt = datetime.datetime.strptime(time_str[:10], "%y%m%d%H%M")
+        return dt.replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+def legacy_extract(notams_list):
+    # The two uncompiled searches of the legacy parser, without timestamp parsing
+    return [
+        (re.search(r'\(([A-Z]{3,4})\)', text), re.search(r'EFFECTIVE:\s*([0-9]{10})-([0-9A-Z]*)', text))
+        for text in notams_list
+    ]
+
+def scanner_extract(notams_list):
+    return [scan_notam(text) for text in notams_list]
+
+def legacy_process_text_notams(notams_list):
+    # Two uncompiled searches per NOTAM, kept verbatim as the reference
+    results = []
+    facility_pattern = r'\(([A-Z]{3,4})\)'
+    effective_pattern = r'EFFECTIVE:\s*([0-9]{10})-([0-9A-Z]*)'
+
+    for notam_text in notams_list:
+        clean_text = notam_text.strip()
+        fac_match = re.search(facility_pattern, clean_text)
+        facility_id = fac_match.group(1) if fac_match else None
+
+        start_time = None
+        end_time = None
+        eff_match = re.search(effective_pattern, clean_text)
+        if eff_match:
+            start_str = eff_match.group(1)
+            end_str = eff_match.group(2)
+            start_time = legacy_parse_notam_effective_time(start_str)
+            if end_str and end_str.isdigit() and len(end_str) >= 10:
+                end_time = legacy_parse_notam_effective_time(end_str)
+            elif end_str in ['UFN', 'PERM']:
+                end_time = None
+
+        if facility_id and start_time:
+            results.append({
+                'facility_id': facility_id,
+                'status_type': "NOTAM",
+                'start_time': start_time,
+                'end_time': end_time,
+                'raw_notam_text': clean_text
+            })
+    return results
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.messages} synthetic NOTAMs...")
+    notams = synthetic_notams(args.messages)
+
+    stripped = [text.strip() for text in notams]
+    _, scan_secs = timed(scanner_extract, stripped)
+    print(f"extract scanner: {scan_secs:.2f}s ({args.messages / scan_secs:,.0f} msgs/s)")
+    _, legacy_scan_secs = timed(legacy_extract, stripped)
+    print(f"extract legacy:  {legacy_scan_secs:.2f}s ({args.messages / legacy_scan_secs:,.0f} msgs/s)")
+
+    scanner, scanner_secs = timed(process_text_notams, notams)
+    print(f"scanner: {scanner_secs:.2f}s ({args.messages / scanner_secs:,.0f} msgs/s, {len(scanner)} records)")
+
+    legacy, legacy_secs = timed(legacy_process_text_notams, notams)
+    print(f"legacy:  {legacy_secs:.2f}s ({args.messages / legacy_secs:,.0f} msgs/s, {len(legacy)} records)")
+    print(f"ratio:   {legacy_secs / scanner_secs:.2f}x")
+
+if __name__ == "__main__":
+    main()
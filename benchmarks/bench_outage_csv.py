@@ -0,0 +1,91 @@
+"""
+Benchmark: vectorized process_outage_csv vs the original iterrows/strptime parser.
+
+Usage: python benchmarks/bench_outage_csv.py [--rows 1000000] [--skip-legacy]
+"""
+import argparse
+import datetime
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import timezone
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# worker_job imports common.database, which needs a DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pandas as pd
+from worker.worker_job import process_outage_csv
+from benchmarks.generators import write_outage_csv
+
+def legacy_parse_csv_datetime(dt_str):
+    if not dt_str or pd.isna(dt_str):
+        return None
+    try:
+        dt = datetime.datetime.strptime(dt_str, "%m/%d/%y %H:%M")
+        return dt.replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+def legacy_process_outage_csv(file_path):
+    # Row-by-row parser this benchmark replaces, kept verbatim as the reference
+    results = []
+    df = pd.read_csv(file_path)
+    for _, row in df.iterrows():
+        facility_id = row.get('FACILITY')
+        status_type = row.get('OUTAGE_TYPE')
+        raw_notam_text = row.get('DETAILS')
+
+        start_time = legacy_parse_csv_datetime(row.get('TIME_LOST'))
+        end_time = legacy_parse_csv_datetime(row.get('EST_REPAIR'))
+
+        if facility_id and status_type and start_time:
+            results.append({
+                'facility_id': facility_id,
+                'status_type': status_type,
+                'start_time': start_time,
+                'end_time': end_time,
+                'raw_notam_text': raw_notam_text
+            })
+    return results
+
+def normalize(records):
+    # The legacy parser leaks NaN for empty cells, the vectorized one returns None
+    return [
+        {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in r.items()}
+        for r in records
+    ]
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the vectorized parser")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "outage_log.csv")
+        print(f"Generating {args.rows} synthetic rows...")
+        write_outage_csv(path, args.rows)
+
+        vectorized, vectorized_secs = timed(process_outage_csv, path)
+        print(f"vectorized: {vectorized_secs:.2f}s ({args.rows / vectorized_secs:,.0f} rows/s)")
+
+        if not args.skip_legacy:
+            legacy, legacy_secs = timed(legacy_process_outage_csv, path)
+            print(f"legacy:     {legacy_secs:.2f}s ({args.rows / legacy_secs:,.0f} rows/s)")
+            print(f"speedup:    {legacy_secs / vectorized_secs:.1f}x")
+            assert normalize(legacy) == vectorized, "vectorized output differs from legacy parser"
+            print("outputs match")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: building a 10k-row list response, Pydantic per-row validation vs tuple rows + orjson.
+
+Each variant fetches the rows from a seeded SQLite file and produces the JSON
+body the list endpoint would send:
+
+    pydantic   ORM objects -> TypeAdapter(List[StatusReport]) validate + dump_json
+    fast       column tuples -> orjson (api/app/serialization.py)
+    projected  fast path with fields=facility_id,status_type,start_time,end_time
+
+Usage: python benchmarks/bench_serialization.py [--rows 10000] [--repeat 5]
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# common.database needs a DATABASE_URL at import
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from common import models, schemas
+from api.app.serialization import parse_fields, columns_for, dump_rows
+
+list_adapter = TypeAdapter(List[schemas.StatusReport])
+
+def seed(engine, rows):
+    models.Base.metadata.create_all(bind=engine)
+    start = datetime.datetime(2025, 12, 17, tzinfo=datetime.timezone.utc)
+    with Session(engine) as db:
+        db.add_all([
+            models.StatusReport(
+                facility_id=f"K{i % 500:03d}", status_type="RUNWAY", start_time=start + datetime.timedelta(minutes=i),
+                end_time=start + datetime.timedelta(minutes=i + 90),
+                raw_notam_text=f"!DEN 12/{i % 1000:03d} (KDEN) ZDV RWY 17L/35R CLSD due to WIP MOWING. " * 3
+            )
+            for i in range(rows)
+        ])
+        db.commit()
+
+def pydantic_body(db, rows):
+    reports = db.scalars(select(models.StatusReport).order_by(models.StatusReport.report_id).limit(rows)).all()
+    return list_adapter.dump_json(list_adapter.validate_python(reports, from_attributes=True))
+
+def fast_body(db, rows, fields=None):
+    names = parse_fields(fields)
+    result = db.execute(select(*columns_for(names)).order_by(models.StatusReport.report_id).limit(rows)).all()
+    return dump_rows(names, result)
+
+def best_of(repeat, fn, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return body, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        seed(engine, args.rows)
+        with Session(engine) as db:
+            variants = [
+                ('pydantic', pydantic_body, (db, args.rows)),
+                ('fast', fast_body, (db, args.rows)),
+                ('projected', fast_body, (db, args.rows, ['facility_id,status_type,start_time,end_time'])),
+            ]
+            baseline = None
+            for name, fn, fn_args in variants:
+                db.expunge_all()
+                body, seconds = best_of(args.repeat, fn, *fn_args)
+                baseline = baseline or seconds
+                print(f"{name:<10} {seconds * 1000:8.1f} ms  {len(body) / 1024:8.0f} KiB  "
+                      f"{args.rows / seconds:>10,.0f} rows/s  {baseline / seconds:5.1f}x")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: cold import time of the API and worker entry points.
+
+Each target is imported in a fresh interpreter (so nothing is cached in
+sys.modules) with DATABASE_URL pointing at a closed port: importing must
+neither connect to a database nor load the DBAPI driver. The median over
+--runs runs is compared against STARTUP_BUDGETS, which tests/common/test_startup.py
+enforces as well, together with the modules that must stay out of the import.
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Seconds, for the median cold import on a developer machine or CI runner
+STARTUP_BUDGETS = {
+    'api.app.main': 2.0,
+    'worker.worker_job': 1.5,
+}
+# Loaded on first use only
+DEFERRED_MODULES = {
+    'api.app.main': ('pandas', 'psycopg2', 'asyncpg'),
+    'worker.worker_job': ('pandas', 'psycopg2'),
+}
+# Nothing listens there, any connection attempt at import fails loudly
+UNREACHABLE_DATABASE_URL = "postgresql://flos@127.0.0.1:1/flos"
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': sorted(m for m in {deferred!r} if m in sys.modules)}}))
+"""
+
+def measure(module, deferred=()):
+    """Imports `module` in a new interpreter, returns (seconds, deferred modules that got loaded)."""
+    env = dict(os.environ, DATABASE_URL=UNREACHABLE_DATABASE_URL, PYTHONPATH=project_root)
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module, deferred=tuple(deferred))],
+        cwd=project_root, env=env, capture_output=True, text=True, check=True
+    )
+    # The probe's JSON is the last line, the worker may print before it
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report['seconds'], report['modules']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in STARTUP_BUDGETS.items():
+        runs = [measure(module, DEFERRED_MODULES[module]) for _ in range(args.runs)]
+        median = statistics.median(seconds for seconds, _ in runs)
+        loaded = sorted({name for _, modules in runs for name in modules})
+        ok = median <= budget and not loaded
+        failed |= not ok
+        print(f"{module:<20} median {median * 1000:7.1f} ms  min {min(s for s, _ in runs) * 1000:7.1f} ms  "
+              f"budget {budget * 1000:.0f} ms  {'ok' if ok else 'OVER'}"
+              + (f"  loaded eagerly: {', '.join(loaded)}" if loaded else ""))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
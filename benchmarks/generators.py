@@ -0,0 +1,77 @@
+"""
+Seeded synthetic inputs for the worker benchmarks.
+
+Each generator produces the same data for the same seed, shaped like the
+files in worker/data: a runway status JSON array, an outage log CSV and a
+list of legacy text NOTAMs.
+"""
+import datetime
+import json
+import random
+
+FACILITIES = ["ZNY", "ZLA", "ZTL", "ZDV", "ZOA", "ZAN", "KDEN", "KORD", "KATL", "KSFO"]
+OUTAGE_TYPES = ["RADAR_DISPLAY", "VOICE_COMM", "NETWORK_FAILURE", "NAVAID", "POWER"]
+
+AIRPORTS = ["KORD", "KATL", "KDEN", "KSFO", "KLAX", "KJFK", "KSEA", "KDFW", "KBOS", "KMIA"]
+REPORT_TYPES = ["RUNWAY_STATUS", "TAXIWAY_STATUS", "APRON_STATUS"]
+RUNWAY_STATUSES = ["CLOSED", "RESTRICTED", "OPEN"]
+CLOSURE_REASONS = ["Routine Maintenance - Asphalt", "Crane Activity near Hangar 3", "Snow Removal", ""]
+
+NOTAM_FACILITIES = [("DEN", "KDEN", "ZDV"), ("SFO", "KSFO", "ZOA"), ("ORD", "KORD", "ZAU"),
+                    ("ATL", "KATL", "ZTL"), ("HYG", "KHYG", "ZAN")]
+NOTAM_SUBJECTS = ["RWY 17L/35R CLSD due to WIP MOWING.", "ILS RWY 28R INOP.", "TWY B CLSD.",
+                  "OBST CRANE 120FT AGL.", "VOR OTS FOR MAINT."]
+NOTAM_WINDOWS = ["{start}-{end}.", "{start} UNTIL UFN.", "{start}-PERM.", "{start}-{end}EST."]
+
+BASE_TIME = datetime.datetime(2025, 1, 1)
+
+def write_runway_json(path, records, seed=42):
+    # Written one element at a time so large feeds never sit in memory
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        f.write("[\n")
+        for i in range(records):
+            active = BASE_TIME + datetime.timedelta(minutes=15 * rng.randrange(35000))
+            reopen = active + datetime.timedelta(hours=rng.randrange(1, 72))
+            item = {
+                "feed_id": 100000 + i,
+                "facility_icao": rng.choice(AIRPORTS),
+                "report_type": rng.choice(REPORT_TYPES),
+                "status": rng.choice(RUNWAY_STATUSES),
+                "affected_entity": f"{rng.randrange(1, 37):02d}L/{rng.randrange(1, 37):02d}R",
+                "closure_reason": rng.choice(CLOSURE_REASONS),
+                "time_active_utc": active.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "estimated_reopen_utc": reopen.strftime("%Y-%m-%dT%H:%M:%SZ") if rng.random() > 0.1 else None
+            }
+            f.write(("  " if i == 0 else ",\n  ") + json.dumps(item))
+        f.write("\n]\n")
+
+def write_outage_csv(path, rows, seed=42):
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        f.write("FACILITY,SERVICE_AREA,OUTAGE_TYPE,DETAILS,TIME_LOST,EST_REPAIR\n")
+        for i in range(rows):
+            lost = BASE_TIME + datetime.timedelta(minutes=15 * rng.randrange(35000))
+            repair = lost + datetime.timedelta(hours=rng.randrange(1, 48))
+            repair_str = repair.strftime("%m/%d/%y %H:%M") if rng.random() > 0.1 else ""
+            f.write(
+                f"{rng.choice(FACILITIES)},Area {i % 7},{rng.choice(OUTAGE_TYPES)},"
+                f"Synthetic outage {i},{lost.strftime('%m/%d/%y %H:%M')},{repair_str}\n"
+            )
+
+def synthetic_notams(count, seed=42):
+    rng = random.Random(seed)
+    notams = []
+    for i in range(count):
+        location, facility, artcc = rng.choice(NOTAM_FACILITIES)
+        day = rng.randrange(1, 28)
+        start = f"2512{day:02d}{rng.randrange(24):02d}00"
+        end = f"2512{day + 1:02d}{rng.randrange(24):02d}00"
+        window = rng.choice(NOTAM_WINDOWS).format(start=start, end=end)
+        notams.append(
+            f"\n    !{location} 12/{i % 1000:03d} ({facility}) {artcc}\n"
+            f"    {rng.choice(NOTAM_SUBJECTS)}\n"
+            f"    EFFECTIVE: {window}\n"
+            f"    CONTACT TOWER FOR SPECIFIC INSTRUCTIONS.\n"
+        )
+    return notams
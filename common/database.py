@@ -1,7 +1,14 @@
 import os
-from sqlalchemy import create_engine
+import re
+import time
+from functools import lru_cache
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from common import metrics
+from common.pooling import POOL_PROFILE, pool_settings, engine_options, instrument
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
@@ -15,7 +22,113 @@ if not DATABASE_URL:
         DATABASE_URL = f"postgresql://{user}:{password}@{host}:{port}/{db}"
 
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+POOL_SETTINGS = pool_settings()
+
+DB_STATEMENT_SECONDS = metrics.Histogram(
+    'db_statement_duration_seconds', "Time from sending a SQL statement to its cursor returning",
+    ('engine', 'operation', 'table'), buckets=metrics.STATEMENT_BUCKETS
+)
+DB_STATEMENT_ERRORS = metrics.Counter(
+    'db_statement_errors_total', "SQL statements that raised", ('engine', 'operation', 'table')
+)
+
+STATEMENT_OPERATIONS = ('select', 'insert', 'update', 'delete', 'with')
+STATEMENT_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN)\s+"?(\w+)', re.IGNORECASE)
+
+@lru_cache(maxsize=1024)
+def statement_labels(statement):
+    """(operation, table) of a SQL string, 'other' for anything outside the models' tables."""
+    words = statement.split(None, 1)
+    operation = words[0].lower() if words else ''
+    match = STATEMENT_TABLE.search(statement)
+    table = match.group(1).lower() if match else ''
+    # Bounded label values: raw SQL, partitions and catalog tables all end up as 'other'
+    return (operation if operation in STATEMENT_OPERATIONS else 'other',
+            table if table in Base.metadata.tables else 'other')
+
+def time_statements(name, engine):
+    """Observes every cursor execution of `engine` (or AsyncEngine.sync_engine) in DB_STATEMENT_SECONDS."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('statement_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info['statement_start'].pop()
+        operation, table = statement_labels(statement)
+        DB_STATEMENT_SECONDS.observe(time.perf_counter() - start, engine=name, operation=operation, table=table)
+
+    @event.listens_for(engine, 'handle_error')
+    def failed_statement(context):
+        # after_cursor_execute is skipped for a failed statement, drop its start time here
+        starts = context.connection.info.get('statement_start') if context.connection is not None else None
+        if starts and context.statement is not None:
+            starts.pop()
+            operation, table = statement_labels(context.statement)
+            DB_STATEMENT_ERRORS.inc(engine=name, operation=operation, table=table)
+
+# Created on first use rather than at import: create_engine() loads the DBAPI
+# driver, and importing the models or the API should not need either
+@lru_cache(maxsize=None)
+def get_engine():
+    engine = create_engine(DATABASE_URL, pool_logging_name=POOL_PROFILE, **engine_options(DATABASE_URL, POOL_SETTINGS))
+    instrument(POOL_PROFILE, engine)
+    time_statements(POOL_PROFILE, engine)
+    return engine
+
+class LazySessionMaker(sessionmaker):
+    """A sessionmaker bound to get_engine() when the first session is made, unless bound already."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get('bind') is None and 'bind' not in local_kw:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+SessionLocal = LazySessionMaker(autocommit=False, autoflush=False)
+
+def __getattr__(name):
+    # `from common.database import engine` keeps working, and only then creates it
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 Base = declarative_base()
+
+# Async drivers used in place of the sync ones (psycopg2, pysqlite)
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+def to_async_url(url):
+    """Maps a sync database URL to its async driver, e.g. postgresql:// -> postgresql+asyncpg://."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    if backend == 'postgresql':
+        # asyncpg takes ssl=, not libpq's sslmode=
+        sslmode = url.query.get('sslmode')
+        if sslmode:
+            url = url.difference_update_query(['sslmode']).update_query_dict({'ssl': sslmode})
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+# Created on first use: the worker only uses the sync engine and does not ship the async drivers
+@lru_cache(maxsize=None)
+def get_async_engine():
+    from sqlalchemy.ext.asyncio import create_async_engine
+    name = f"{POOL_PROFILE}_async"
+    async_engine = create_async_engine(
+        to_async_url(DATABASE_URL), pool_logging_name=name,
+        **engine_options(DATABASE_URL, POOL_SETTINGS, is_async=True)
+    )
+    instrument(name, async_engine.sync_engine)
+    time_statements(name, async_engine.sync_engine)
+    return async_engine
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker():
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    # Rows are serialized after commit/close, so keep their loaded attributes
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
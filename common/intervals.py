@@ -0,0 +1,112 @@
+"""
+Validity windows of status reports as intervals.
+
+On PostgreSQL every status_report row carries a generated
+`validity tstzrange` column, [start_time, end_time) with a NULL end_time
+meaning unbounded (UFN/PERM), covered by a GiST index, so "active at T" and
+"overlaps [from, to)" are single index lookups however much history the
+table holds. The column is created by the migration, or by the DDL below
+when the tables come from metadata.create_all().
+
+`active_at()` and `overlaps()` compile to range operators on PostgreSQL and
+to the equivalent start_time/end_time comparisons elsewhere (SQLite), which
+use the plain column indexes. On PostgreSQL they also bound start_time from
+above, so the monthly partitions (worker/partitions.py) after the instant or
+window are pruned.
+"""
+from sqlalchemy import Boolean, DateTime, and_, cast, func, literal, literal_column, null, or_
+from sqlalchemy.dialects.postgresql import TSTZRANGE
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement, Null
+from sqlalchemy.sql.visitors import InternalTraversal
+
+# end_time before start_time would make tstzrange() raise, such rows get an empty range
+VALIDITY_EXPRESSION = (
+    "tstzrange(start_time, CASE WHEN end_time < start_time THEN start_time ELSE end_time END, '[)')"
+)
+VALIDITY_DDL = [
+    f"ALTER TABLE status_report ADD COLUMN IF NOT EXISTS validity tstzrange "
+    f"GENERATED ALWAYS AS ({VALIDITY_EXPRESSION}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_status_report_validity ON status_report USING gist (validity)",
+]
+
+def timestamp(value):
+    return null() if value is None else literal(value, DateTime(timezone=True))
+
+class ActiveAt(ColumnElement):
+    """Reports whose validity window contains `at`."""
+    type = Boolean()
+    inherit_cache = True
+    _traverse_internals = [('at', InternalTraversal.dp_clauseelement)]
+
+    def __init__(self, at):
+        self.at = timestamp(at)
+
+class Overlaps(ColumnElement):
+    """Reports whose validity window overlaps [start, end), either bound may be None (open)."""
+    type = Boolean()
+    inherit_cache = True
+    _traverse_internals = [
+        ('start', InternalTraversal.dp_clauseelement),
+        ('end', InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, start, end):
+        self.start = timestamp(start)
+        self.end = timestamp(end)
+
+def active_at(at):
+    return ActiveAt(at)
+
+def overlaps(start, end):
+    return Overlaps(start, end)
+
+def columns():
+    # Imported late, common.models imports this module for the DDL
+    from common.models import StatusReport
+    return StatusReport.start_time, StatusReport.end_time
+
+def validity():
+    return literal_column('status_report.validity', TSTZRANGE)
+
+def group(compiler, clause, **kw):
+    # Parenthesized, dialects without a native boolean append "= 1" to the element
+    return '(' + compiler.process(clause, **kw) + ')'
+
+@compiles(ActiveAt)
+def compile_active_at(element, compiler, **kw):
+    start_time, end_time = columns()
+    return group(compiler, and_(start_time <= element.at, or_(end_time.is_(None), end_time > element.at)), **kw)
+
+@compiles(ActiveAt, 'postgresql')
+def compile_active_at_postgresql(element, compiler, **kw):
+    start_time, _ = columns()
+    # Implied by the range, but only a predicate on the partition key lets the planner
+    # skip the partitions of months after `at`. There is no lower bound to add: an
+    # open-ended report from any month can still be active
+    return group(compiler, and_(
+        validity().contains(cast(element.at, DateTime(timezone=True))), start_time <= element.at
+    ), **kw)
+
+@compiles(Overlaps)
+def compile_overlaps(element, compiler, **kw):
+    start_time, end_time = columns()
+    clauses = []
+    if not isinstance(element.end, Null):
+        clauses.append(start_time < element.end)
+    if not isinstance(element.start, Null):
+        clauses.append(or_(end_time.is_(None), end_time > element.start))
+    return group(compiler, and_(*clauses) if clauses else literal(True), **kw)
+
+@compiles(Overlaps, 'postgresql')
+def compile_overlaps_postgresql(element, compiler, **kw):
+    window = func.tstzrange(
+        cast(element.start, DateTime(timezone=True)), cast(element.end, DateTime(timezone=True)), '[)',
+        type_=TSTZRANGE
+    )
+    clause = validity().overlaps(window)
+    if not isinstance(element.end, Null):
+        # Partition pruning, as for active_at()
+        start_time, _ = columns()
+        clause = and_(clause, start_time < element.end)
+    return group(compiler, clause, **kw)
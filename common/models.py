@@ -1,9 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, UniqueConstraint, Index, DDL, event, text
 from sqlalchemy.sql import func
 from common.database import Base
+from common.intervals import VALIDITY_DDL
+from common.search import SEARCH_DDL
+from common.versioning import SEED_VERSION, VERSION_DDL_POSTGRESQL, VERSION_DDL_SQLITE
 
 class StatusReport(Base):
     __tablename__ = "status_report"
+    __table_args__ = (
+        # Natural key used by the worker's bulk upsert (ON CONFLICT target)
+        UniqueConstraint('facility_id', 'status_type', 'start_time', name='uq_status_report_natural_key'),
+        # Facility + time window filters of the list endpoint
+        Index('ix_status_report_facility_start', 'facility_id', 'start_time'),
+        # Active rows: open-ended ones come from this partial index, the rest from the
+        # end_time index (now() cannot appear in an index predicate)
+        Index('ix_status_report_open', 'start_time',
+              postgresql_where=text('end_time IS NULL'), sqlite_where=text('end_time IS NULL')),
+        Index('ix_status_report_end_time', 'end_time'),
+    )
 
     report_id = Column(Integer, primary_key=True, index=True)
     facility_id = Column(String, index=True, nullable=False)
@@ -11,4 +25,64 @@ class StatusReport(Base):
     start_time = Column(DateTime(timezone=True))
     end_time = Column(DateTime(timezone=True))
     raw_notam_text = Column(String)
+    # Fingerprint of the normalized fields, the worker only rewrites rows whose hash changed
+    content_hash = Column(String(32))
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # PostgreSQL also has generated `validity tstzrange` (common/intervals.py) and
+    # `search_vector tsvector` (common/search.py) columns. They are not mapped: they are only
+    # read by the index-backed active_at()/overlaps() and text_match()/text_rank() predicates.
+    # On PostgreSQL the table is also range-partitioned by month of start_time (worker/partitions.py),
+    # with (report_id, start_time) as its primary key; report_id alone still identifies a row
+
+for statement in VALIDITY_DDL + SEARCH_DDL:
+    event.listen(StatusReport.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+
+class IngestCheckpoint(Base):
+    __tablename__ = "ingest_checkpoint"
+
+    # Worker source name, e.g. 'outage_csv'
+    source = Column(String, primary_key=True)
+    path = Column(String, nullable=False)
+    size = Column(BigInteger)
+    mtime_ns = Column(BigInteger)
+    # sha256 of the first `size` bytes (or of the source contents for in-memory sources)
+    digest = Column(String(64), nullable=False)
+    # End of the last complete line parsed, append-only sources resume from here
+    byte_offset = Column(BigInteger, nullable=False, default=0)
+    last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class StatusSummary(Base):
+    """
+    Per facility and status_type rollup of status_report, maintained by the
+    worker in the same transaction as its upserts (worker/summary.py).
+    """
+    __tablename__ = "status_summary"
+
+    facility_id = Column(String, primary_key=True)
+    status_type = Column(String, primary_key=True)
+    report_count = Column(Integer, nullable=False)
+    # Reports without an end_time
+    open_count = Column(Integer, nullable=False)
+    # Reports active at as_of
+    active_count = Column(Integer, nullable=False)
+    as_of = Column(DateTime(timezone=True), nullable=False)
+    # Earliest start_time/end_time after as_of, when active_count changes without a write
+    next_change = Column(DateTime(timezone=True), index=True)
+
+class StatusVersion(Base):
+    """
+    Single-row change counter of status_report, bumped by triggers on every
+    write (common/versioning.py). The API's ETags are derived from it.
+    """
+    __tablename__ = "status_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# After every table exists: the triggers on status_report update status_version
+event.listen(Base.metadata, 'after_create', DDL(SEED_VERSION))
+for statement in VERSION_DDL_POSTGRESQL:
+    event.listen(Base.metadata, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+for statement in VERSION_DDL_SQLITE:
+    event.listen(Base.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
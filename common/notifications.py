@@ -0,0 +1,66 @@
+"""
+Change notifications between the worker and the API.
+
+After an ingest writes rows, the worker sends one PostgreSQL NOTIFY per
+facility (split further when a payload would exceed NOTIFY's 8000 byte limit)
+on STATUS_NOTIFY_CHANNEL, within the ingest transaction so listeners only see
+committed changes. Payloads are JSON:
+
+    {"facility_id": "KDEN", "report_ids": [12, 57]}
+
+Past NOTIFY_MAX_IDS changed rows in one run, ids are no longer tracked and
+each facility is announced with "report_ids": null, meaning "refetch".
+"""
+import json
+import os
+
+STATUS_NOTIFY_CHANNEL = os.getenv("STATUS_NOTIFY_CHANNEL", "status_report_changes")
+NOTIFY_MAX_IDS = int(os.getenv("NOTIFY_MAX_IDS", "10000"))
+# PostgreSQL rejects payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+class ChangeSet:
+    """Changed report ids grouped by facility, bounded by `max_ids`."""
+
+    def __init__(self, max_ids=None):
+        self.max_ids = NOTIFY_MAX_IDS if max_ids is None else max_ids
+        self.ids = {}
+        self.count = 0
+
+    def add(self, report_id, facility_id):
+        self.count += 1
+        ids = self.ids.setdefault(facility_id, [])
+        if self.count > self.max_ids:
+            # Too many to list, keep the facilities only
+            for facility in self.ids:
+                self.ids[facility] = None
+        elif ids is not None:
+            ids.append(report_id)
+
+    def __bool__(self):
+        return self.count > 0
+
+    def payloads(self, limit=NOTIFY_PAYLOAD_LIMIT):
+        for facility_id, ids in self.ids.items():
+            if ids is None:
+                yield encode_change(facility_id, None)
+                continue
+            start = 0
+            while start < len(ids):
+                # Ids are at most 20 digits plus a separator
+                end = start + max((limit - len(facility_id) - 50) // 21, 1)
+                yield encode_change(facility_id, ids[start:end])
+                start = end
+
+def encode_change(facility_id, report_ids):
+    return json.dumps({'facility_id': facility_id, 'report_ids': report_ids}, separators=(',', ':'))
+
+def decode_change(payload):
+    """Parses a notification payload, returns None if it is not a change event."""
+    try:
+        change = json.loads(payload)
+    except ValueError:
+        return None
+    if not isinstance(change, dict) or 'facility_id' not in change:
+        return None
+    return change
@@ -0,0 +1,210 @@
+"""
+Connection pool settings and instrumentation.
+
+Pool options are read from the environment per profile: `api` (the default)
+or `worker`, picked with DB_POOL_PROFILE. Each setting is looked up as
+<PROFILE>_DB_<NAME>, then DB_<NAME>, then the profile default, e.g.
+API_DB_POOL_SIZE, DB_POOL_SIZE, 5:
+
+    POOL_SIZE, MAX_OVERFLOW, POOL_TIMEOUT (s), POOL_RECYCLE (s),
+    POOL_PRE_PING (0/1), STATEMENT_TIMEOUT_MS (0 disables it)
+
+Pool options only apply to PostgreSQL; SQLite keeps SQLAlchemy's defaults.
+Statistics (checkouts, wait time, connect latency, timeouts) are collected
+per engine through pool events and reported together with the live pool
+status by `pool_status()`, and exported as db_pool_* metrics.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from common import metrics
+
+POOL_PROFILE = os.getenv("DB_POOL_PROFILE", "api").lower()
+
+PROFILE_DEFAULTS = {
+    # Short requests: more connections, fail fast on a saturated pool or a runaway query
+    'api': {'pool_size': 5, 'max_overflow': 10, 'pool_timeout': 10, 'pool_recycle': 1800,
+            'pool_pre_ping': True, 'statement_timeout_ms': 5000},
+    # One ingest at a time, with bulk upserts that may legitimately take minutes
+    'worker': {'pool_size': 2, 'max_overflow': 0, 'pool_timeout': 30, 'pool_recycle': 1800,
+               'pool_pre_ping': True, 'statement_timeout_ms': 300000},
+}
+
+def pool_settings(profile=None, environ=os.environ):
+    """Returns the pool settings of `profile` with environment overrides applied."""
+    profile = (profile or POOL_PROFILE).lower()
+    if profile not in PROFILE_DEFAULTS:
+        raise ValueError(f"Unknown pool profile '{profile}', expected one of {sorted(PROFILE_DEFAULTS)}")
+    settings = {}
+    for name, default in PROFILE_DEFAULTS[profile].items():
+        key = 'DB_' + name.upper()
+        value = environ.get(f"{profile.upper()}_{key}", environ.get(key))
+        if value is None:
+            settings[name] = default
+        elif isinstance(default, bool):
+            settings[name] = value.strip().lower() in ('1', 'true', 'yes', 'on')
+        else:
+            settings[name] = type(default)(value)
+    return settings
+
+def engine_options(url, settings, is_async=False):
+    """create_engine() keyword arguments for `url` with `settings` applied."""
+    if make_url(url).get_backend_name() != 'postgresql':
+        return {}
+    options = {
+        'pool_size': settings['pool_size'],
+        'max_overflow': settings['max_overflow'],
+        'pool_timeout': settings['pool_timeout'],
+        'pool_recycle': settings['pool_recycle'],
+        'pool_pre_ping': settings['pool_pre_ping'],
+        'poolclass': InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+    }
+    timeout = settings['statement_timeout_ms']
+    if timeout:
+        # Set per connection, so a slow query is cancelled server side and its connection returned
+        if is_async:
+            options['connect_args'] = {'server_settings': {'statement_timeout': str(timeout)}}
+        else:
+            options['connect_args'] = {'options': f"-c statement_timeout={timeout}"}
+    return options
+
+class PoolStats:
+    """Counters for one engine's pool, updated from pool events."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self.lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_connect(self, seconds):
+        with self.lock:
+            self.connects += 1
+            self.connect_total += seconds
+            self.connect_max = max(self.connect_max, seconds)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'connects': self.connects,
+                'timeouts': self.timeouts,
+                'wait_ms_total': round(self.wait_total * 1000, 3),
+                'wait_ms_max': round(self.wait_max * 1000, 3),
+                'connect_ms_avg': round(self.connect_total / self.connects * 1000, 3) if self.connects else None,
+                'connect_ms_max': round(self.connect_max * 1000, 3),
+            }
+
+# Engine name -> (PoolStats, engine), see instrument()
+_registry = {}
+
+def get_stats(name):
+    entry = _registry.get(name)
+    return entry[0] if entry else None
+
+class TimedCheckoutMixin:
+    """Times waits for a connection; there is no pool event for the start of a checkout."""
+
+    def _do_get(self):
+        stats = get_stats(self._orig_logging_name)
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if stats is not None:
+                stats.record_wait(time.perf_counter() - start, timed_out)
+
+class InstrumentedQueuePool(TimedCheckoutMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+def instrument(name, engine):
+    """
+    Registers pool events on `engine` (a sync Engine, or AsyncEngine.sync_engine)
+    and makes its statistics available as `name` in pool_status(). The pool
+    must have been created with pool_logging_name=`name` for wait times to be
+    recorded.
+    """
+    stats = PoolStats()
+    _registry[name] = (stats, engine)
+
+    @event.listens_for(engine, 'do_connect')
+    def start_connect(dialect, conn_rec, cargs, cparams):
+        conn_rec.info['connect_start'] = time.perf_counter()
+
+    @event.listens_for(engine.pool, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        start = connection_record.info.pop('connect_start', None)
+        if start is not None:
+            stats.record_connect(time.perf_counter() - start)
+
+    @event.listens_for(engine.pool, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with stats.lock:
+            stats.checkouts += 1
+
+    @event.listens_for(engine.pool, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        with stats.lock:
+            stats.checkins += 1
+
+    return stats
+
+def pool_status():
+    """Live pool state and collected statistics of every instrumented engine."""
+    status = {}
+    for name, (stats, engine) in _registry.items():
+        pool = engine.pool
+        entry = {'pool': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update(size=pool.size(), checked_in=pool.checkedin(),
+                         checked_out=pool.checkedout(), overflow=pool.overflow(), timeout=pool.timeout())
+        entry.update(stats.snapshot())
+        status[name] = entry
+    return status
+
+def pool_samples(key, scale=1):
+    """Callback for common.metrics: {(engine name,): pool_status()[name][key] * scale}."""
+    def samples():
+        return {(name,): None if entry.get(key) is None else entry[key] * scale
+                for name, entry in pool_status().items()}
+    return samples
+
+metrics.Callback('db_pool_checkouts_total', "Connections checked out of the pool", 'counter',
+                 pool_samples('checkouts'), ('engine',))
+metrics.Callback('db_pool_connects_total', "New database connections opened", 'counter',
+                 pool_samples('connects'), ('engine',))
+metrics.Callback('db_pool_timeouts_total', "Checkouts that timed out waiting for a connection", 'counter',
+                 pool_samples('timeouts'), ('engine',))
+metrics.Callback('db_pool_wait_seconds_total', "Time spent waiting for a pooled connection", 'counter',
+                 pool_samples('wait_ms_total', 0.001), ('engine',))
+metrics.Callback('db_pool_checked_out', "Connections currently in use", 'gauge',
+                 pool_samples('checked_out'), ('engine',))
+metrics.Callback('db_pool_size', "Configured pool size", 'gauge', pool_samples('size'), ('engine',))
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 class StatusReportBase(BaseModel):
     facility_id: str
@@ -14,3 +14,20 @@ class StatusReport(StatusReportBase):
     last_updated: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+class StatusSummary(BaseModel):
+    facility_id: str
+    status_type: str
+    report_count: int
+    open_count: int
+    active_count: int
+    as_of: datetime
+    next_change: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class StatusBatchRequest(BaseModel):
+    ids: List[int] = []
+    facility_ids: List[str] = []
+    fields: Optional[List[str]] = None
+    per_facility: Optional[int] = Field(None, ge=1, le=1000)
@@ -0,0 +1,94 @@
+"""
+Full-text search over status_report.raw_notam_text.
+
+On PostgreSQL every row carries a generated `search_vector tsvector` column
+with a GIN index, so it follows every insert and upsert without the worker
+doing anything. It uses the 'simple' configuration: NOTAM text is made of
+contractions and identifiers (ILS, WIP, OBST, 17L/35R) that language
+stemming and stop words would mangle, so words are only lowercased.
+
+`text_match()` and `text_rank()` compile to websearch_to_tsquery() matching
+and ts_rank() on PostgreSQL: whole words, phrases, OR, ranked results.
+
+The fallback elsewhere (SQLite, i.e. tests and local setups) is weaker and
+only meant to keep the endpoint usable: a report matches when its text
+contains every word of the query as a substring and none of the -excluded
+ones (case-insensitive LIKE, no index), so "RWY" also matches "RWYS",
+phrases and OR are not understood, and all ranks are 0 (results come back
+in report_id order).
+"""
+import re
+
+from sqlalchemy import Boolean, Float, String, and_, func, literal, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+SEARCH_CONFIG = 'simple'
+SEARCH_DDL = [
+    f"ALTER TABLE status_report ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', coalesce(raw_notam_text, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_status_report_search ON status_report USING gin (search_vector)",
+]
+
+# Words of a query for the fallback, websearch operators and quotes are ignored there
+WORD = re.compile(r"[^\s\"']+")
+
+def query_words(q):
+    return [word for word in WORD.findall(q) if word.upper() != 'OR' and word.strip('-')]
+
+class TextMatch(ColumnElement):
+    """Reports whose raw_notam_text matches the web-search style query `q`."""
+    type = Boolean()
+    # The fallback's SQL depends on the words of the query, so no cache key: compiled every time
+    inherit_cache = False
+
+    def __init__(self, q):
+        self.q = literal(q, String)
+
+class TextRank(ColumnElement):
+    """Relevance of raw_notam_text for `q`, higher is better."""
+    type = Float()
+    inherit_cache = True
+    _traverse_internals = [('q', InternalTraversal.dp_clauseelement)]
+
+    def __init__(self, q):
+        self.q = literal(q, String)
+
+def text_match(q):
+    return TextMatch(q)
+
+def text_rank(q):
+    return TextRank(q)
+
+def search_vector():
+    return literal_column('status_report.search_vector', TSVECTOR)
+
+def tsquery(element):
+    return func.websearch_to_tsquery(SEARCH_CONFIG, element.q)
+
+@compiles(TextMatch)
+def compile_text_match(element, compiler, **kw):
+    from common.models import StatusReport
+
+    clauses = []
+    for word in query_words(element.q.value):
+        if word.startswith('-'):
+            clauses.append(~StatusReport.raw_notam_text.contains(word[1:], autoescape=True))
+        else:
+            clauses.append(StatusReport.raw_notam_text.contains(word, autoescape=True))
+    # Parenthesized, dialects without a native boolean append "= 1" to the element
+    return '(' + compiler.process(and_(*clauses) if clauses else literal(False), **kw) + ')'
+
+@compiles(TextMatch, 'postgresql')
+def compile_text_match_postgresql(element, compiler, **kw):
+    return '(' + compiler.process(search_vector().op('@@')(tsquery(element)), **kw) + ')'
+
+@compiles(TextRank)
+def compile_text_rank(element, compiler, **kw):
+    return compiler.process(literal(0.0, Float), **kw)
+
+@compiles(TextRank, 'postgresql')
+def compile_text_rank_postgresql(element, compiler, **kw):
+    return compiler.process(func.ts_rank(search_vector(), tsquery(element), type_=Float), **kw)
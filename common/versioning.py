@@ -0,0 +1,70 @@
+"""
+Change counter of status_report.
+
+status_version holds a single row (id 1) whose `version` goes up with every
+write to status_report, bumped by triggers inside the writing transaction,
+so the API can validate and cache responses with one primary key lookup
+instead of aggregating the whole table (api/app/caching.py). Triggers rather
+than the worker bumping it: rows written by migrations, retention or by hand
+change the version too.
+
+- PostgreSQL: one statement-level trigger, so a bulk upsert batch costs one
+  UPDATE of the row whatever its size. It also fires for statements that
+  change no row, which only costs a spurious cache miss.
+- SQLite (tests, local setups) has no statement triggers, a row-level one
+  per operation does the same.
+
+DETACH/DROP PARTITION fire no trigger, retention calls `bump_version()`.
+"""
+from sqlalchemy import func, update
+
+VERSION_ROW_ID = 1
+
+SEED_VERSION = (
+    f"INSERT INTO status_version (id, version, updated_at) "
+    f"SELECT {VERSION_ROW_ID}, 0, CURRENT_TIMESTAMP "
+    f"WHERE NOT EXISTS (SELECT 1 FROM status_version WHERE id = {VERSION_ROW_ID})"
+)
+
+VERSION_DDL_POSTGRESQL = [
+    f"""
+    CREATE OR REPLACE FUNCTION bump_status_version() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE status_version SET version = version + 1, updated_at = clock_timestamp()
+        WHERE id = {VERSION_ROW_ID};
+        RETURN NULL;
+    END
+    $$
+    """,
+    # Runs on every create_all(): only create the trigger when missing, instead of
+    # replacing it under a lock on status_report at each API start
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                       WHERE tgname = 'status_report_version' AND tgrelid = 'status_report'::regclass) THEN
+            CREATE TRIGGER status_report_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON status_report
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_status_version();
+        END IF;
+    END
+    $$
+    """,
+]
+
+VERSION_DDL_SQLITE = [
+    f"CREATE TRIGGER IF NOT EXISTS status_report_version_{operation.lower()} "
+    f"AFTER {operation} ON status_report FOR EACH ROW BEGIN "
+    f"UPDATE status_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP "
+    f"WHERE id = {VERSION_ROW_ID}; END"
+    for operation in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+def bump_version(db):
+    """Bumps the version for a change no trigger sees. Does not commit."""
+    from common.models import StatusVersion
+
+    db.execute(
+        update(StatusVersion).where(StatusVersion.id == VERSION_ROW_ID)
+        .values(version=StatusVersion.version + 1, updated_at=func.now())
+    )
@@ -1,5 +1,13 @@
+import csv
 import datetime
+import io
+import json
+from unittest.mock import patch
+
 from common.models import StatusReport
+from api.app.caching import ResponseCache
+from api.app.serialization import STATUS_FIELDS, dump_rows
+from common import schemas
 
 def test_health_check(client):
     response = client.get("/health")
@@ -48,3 +56,397 @@ def test_read_single_status_report(client, db_session):
     # Test Non-Existing
     response = client.get(f"/api/v1/status/{report_id + 999}")
     assert response.status_code == 404
+
+def test_read_status_reports_cursor_pagination(client, db_session):
+    start = datetime.datetime(2025, 12, 17, 14, 0, tzinfo=datetime.timezone.utc)
+    db_session.add_all([
+        StatusReport(facility_id=f"K{i:03d}", status_type="RUNWAY", start_time=start)
+        for i in range(5)
+    ])
+    db_session.commit()
+
+    response = client.get("/api/v1/status/", params={"limit": 2})
+    assert [r["facility_id"] for r in response.json()] == ["K000", "K001"]
+    cursor = response.headers["X-Next-Cursor"]
+    assert 'rel="next"' in response.headers["Link"]
+
+    # A row inserted before the cursor's position does not shift the next page
+    db_session.add(StatusReport(facility_id="KNEW", status_type="RUNWAY", start_time=start))
+    db_session.commit()
+
+    seen = []
+    while cursor:
+        response = client.get("/api/v1/status/", params={"limit": 2, "cursor": cursor})
+        seen += [r["facility_id"] for r in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+    assert seen == ["K002", "K003", "K004", "KNEW"]
+
+    # skip/limit still work and are ordered
+    response = client.get("/api/v1/status/", params={"skip": 4, "limit": 10})
+    assert [r["facility_id"] for r in response.json()] == ["K004", "KNEW"]
+    assert "X-Next-Cursor" not in response.headers
+
+def test_read_status_reports_invalid_cursor(client):
+    response = client.get("/api/v1/status/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_read_status_reports_limit_is_clamped(client, db_session, monkeypatch):
+    monkeypatch.setattr("api.app.main.MAX_PAGE_SIZE", 2)
+    t = datetime.datetime(2025, 12, 17, 12, 0, tzinfo=datetime.timezone.utc)
+    db_session.add_all([
+        StatusReport(facility_id=f"K{i:03d}", status_type="RUNWAY", start_time=t,
+                     end_time=t + datetime.timedelta(hours=1), raw_notam_text="RWY CLSD")
+        for i in range(3)
+    ])
+    db_session.commit()
+
+    # Existing clients asking for more still get a page, plus the cursor of the rest
+    for path, params in (("/api/v1/status/", {}), ("/api/v1/status/search", {"q": "RWY"})):
+        response = client.get(path, params={**params, "limit": 5000})
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        rest = client.get(path, params={**params, "limit": 5000, "cursor": response.headers["X-Next-Cursor"]})
+        assert len(rest.json()) == 1
+        assert "X-Next-Cursor" not in rest.headers
+
+def test_read_status_reports_filters(client, db_session):
+    t = datetime.datetime(2025, 12, 17, 12, 0, tzinfo=datetime.timezone.utc)
+    hours = datetime.timedelta(hours=1)
+    db_session.add_all([
+        StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=t, end_time=t + 2 * hours),
+        StatusReport(facility_id="KDEN", status_type="NOTAM_NAVAID", start_time=t + 3 * hours),
+        StatusReport(facility_id="KSFO", status_type="RUNWAY", start_time=t - 5 * hours, end_time=t - hours),
+        StatusReport(facility_id="KORD", status_type="RUNWAY", start_time=t, end_time=t + 5 * hours),
+    ])
+    db_session.commit()
+
+    def facilities(**params):
+        response = client.get("/api/v1/status/", params=params)
+        assert response.status_code == 200
+        return [(r["facility_id"], r["status_type"]) for r in response.json()]
+
+    assert facilities(facility_id=["KDEN", "KSFO"], status_type="RUNWAY") == [("KDEN", "RUNWAY"), ("KSFO", "RUNWAY")]
+    assert facilities(active_at=(t + hours).isoformat()) == [("KDEN", "RUNWAY"), ("KORD", "RUNWAY")]
+    # Open-ended reports stay active
+    assert facilities(active_at=(t + 4 * hours).isoformat()) == [("KDEN", "NOTAM_NAVAID"), ("KORD", "RUNWAY")]
+    assert facilities(start_after=t.isoformat(), end_before=(t + 2 * hours).isoformat()) == [("KDEN", "RUNWAY")]
+
+def test_read_status_reports_conditional_get_and_cache(client, db_session):
+    start = datetime.datetime(2025, 12, 17, 14, 0, tzinfo=datetime.timezone.utc)
+    db_session.add(StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=start))
+    db_session.commit()
+
+    first = client.get("/api/v1/status/")
+    etag = first.headers["ETag"]
+    assert first.headers["X-Cache"] == "MISS"
+    assert "Last-Modified" in first.headers
+
+    second = client.get("/api/v1/status/")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.headers["ETag"] == etag
+    assert second.content == first.content
+
+    not_modified = client.get("/api/v1/status/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    since = client.get("/api/v1/status/", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+    # Other query parameters are another representation
+    assert client.get("/api/v1/status/?facility_id=KDEN").headers["ETag"] != etag
+
+    db_session.add(StatusReport(facility_id="KSFO", status_type="RUNWAY", start_time=start))
+    db_session.commit()
+    changed = client.get("/api/v1/status/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == 2
+
+    report_id = changed.json()[0]["report_id"]
+    single = client.get(f"/api/v1/status/{report_id}")
+    assert client.get(f"/api/v1/status/{report_id}", headers={"If-None-Match": single.headers["ETag"]}).status_code == 304
+
+def test_status_version_follows_every_write(db_session):
+    from common.models import StatusVersion
+
+    def version():
+        db_session.expire_all()
+        return db_session.get(StatusVersion, 1).version
+
+    start = datetime.datetime(2025, 12, 17, 14, 0, tzinfo=datetime.timezone.utc)
+    assert version() == 0
+    report = StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=start)
+    db_session.add(report)
+    db_session.commit()
+    assert version() == 1
+    report.raw_notam_text = "RWY CLSD"
+    db_session.commit()
+    assert version() == 2
+    db_session.delete(report)
+    db_session.commit()
+    assert version() == 3
+
+def test_response_cache_lru_and_ttl():
+    now = [0.0]
+    cache = ResponseCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", "v1", 1)
+    cache.put("b", "v1", 2)
+    assert cache.get("a", "v1") == 1
+    cache.put("c", "v1", 3)
+    # "b" was least recently used
+    assert cache.get("b", "v1") is None
+    # A different version is a miss
+    assert cache.get("a", "v2") is None
+    now[0] = 11
+    assert cache.get("c", "v1") is None
+    assert cache.stats() == {'hits': 1, 'misses': 3, 'size': 0, 'maxsize': 2}
+
+def test_read_status_reports_fields_projection(client, db_session):
+    start = datetime.datetime(2025, 12, 17, 14, 0, tzinfo=datetime.timezone.utc)
+    db_session.add(StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=start, raw_notam_text="long text"))
+    db_session.commit()
+
+    response = client.get("/api/v1/status/", params={"fields": "facility_id,start_time"})
+    assert response.status_code == 200
+    # Schema order, report_id is always included
+    assert list(response.json()[0]) == ["facility_id", "start_time", "report_id"]
+
+    response = client.get("/api/v1/status/", params={"fields": ["status_type", "bogus"]})
+    assert response.status_code == 400
+
+def test_dump_rows_matches_schema_serialization():
+    utc = datetime.timezone.utc
+    records = [
+        dict(report_id=1, facility_id="KDEN", status_type="RUNWAY", start_time=datetime.datetime(2025, 12, 17, 14, 0, tzinfo=utc),
+             end_time=datetime.datetime(2025, 12, 17, 16, 30, 5, 123456, tzinfo=utc), raw_notam_text="RWY CLSD", last_updated=None),
+        dict(report_id=2, facility_id="KSFO", status_type="NOTAM", start_time=datetime.datetime(2025, 12, 17, 14, 0),
+             end_time=None, raw_notam_text=None,
+             last_updated=datetime.datetime(2025, 12, 17, 9, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=-5)))),
+    ]
+    rows = [tuple(record[name] for name in STATUS_FIELDS) for record in records]
+    expected = b"[" + b",".join(
+        schemas.StatusReport(**record).model_dump_json().encode() for record in records
+    ) + b"]"
+    assert dump_rows(STATUS_FIELDS, rows) == expected
+
+def test_export_status_reports(client, db_session):
+    start = datetime.datetime(2025, 12, 17, 14, 0, tzinfo=datetime.timezone.utc)
+    db_session.add_all([
+        StatusReport(facility_id=f"K{i:03d}", status_type="RUNWAY", start_time=start, raw_notam_text=f"text, {i}")
+        for i in range(5)
+    ])
+    db_session.commit()
+
+    with patch("api.app.main.EXPORT_BATCH_SIZE", 2):
+        response = client.get("/api/v1/status/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["facility_id"] for line in lines] == [f"K{i:03d}" for i in range(5)]
+    assert lines[0]["start_time"] == "2025-12-17T14:00:00"
+
+    response = client.get("/api/v1/status/export", params={"format": "csv", "fields": "facility_id,raw_notam_text",
+                                                           "facility_id": ["K001", "K002"]})
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows == [["facility_id", "raw_notam_text", "report_id"], ["K001", "text, 1", "2"], ["K002", "text, 2", "3"]]
+
+    # httpx decodes Content-Encoding: gzip transparently
+    response = client.get("/api/v1/status/export", params={"gzip": "true", "format": "csv"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.text.splitlines()) == 6
+
+def test_read_pool_status(client):
+    response = client.get("/internal/pool")
+    assert response.status_code == 200
+    # The API only uses the async engine, which the startup schema creation has checked out
+    assert response.json()['api_async']['checkouts'] >= 1
+
+def test_change_broadcaster_filters_and_resets():
+    import asyncio
+    from api.app.events import ChangeBroadcaster, iter_events
+
+    async def scenario():
+        broadcaster = ChangeBroadcaster("sqlite://")
+        everything = broadcaster.subscribe()
+        denver = broadcaster.subscribe(["KDEN"])
+        stream = iter_events(broadcaster, denver, keepalive=0.01)
+        assert await anext(stream) == b"retry: 3000\n\n"
+
+        broadcaster.publish({'facility_id': "KSFO", 'report_ids': [1]})
+        broadcaster.publish({'facility_id': "KDEN", 'report_ids': [2]})
+        assert await anext(stream) == b'event: change\ndata: {"facility_id":"KDEN","report_ids":[2]}\n\n'
+        assert await anext(stream) == b": keepalive\n\n"
+        assert everything.queue.qsize() == 2
+
+        # A subscriber that falls behind gets a single reset instead of the backlog
+        for report_id in range(everything.queue.maxsize + 1):
+            broadcaster.publish({'facility_id': "KSFO", 'report_ids': [report_id]})
+        assert (await everything.get())['event'] == 'reset'
+        assert everything.queue.empty()
+
+        await stream.aclose()
+        assert denver not in broadcaster.subscribers
+
+    asyncio.run(scenario())
+
+def test_read_status_summary(client, db_session):
+    from common.models import StatusSummary
+
+    as_of = datetime.datetime(2025, 12, 17, 14, 0)
+    db_session.add_all([
+        StatusSummary(facility_id="KDEN", status_type="RUNWAY", report_count=3, open_count=1,
+                      active_count=2, as_of=as_of),
+        StatusSummary(facility_id="KSFO", status_type="RUNWAY", report_count=1, open_count=0,
+                      active_count=0, as_of=as_of),
+    ])
+    db_session.commit()
+
+    response = client.get("/api/v1/status/summary")
+    assert response.status_code == 200
+    assert [(r['facility_id'], r['active_count']) for r in response.json()] == [("KDEN", 2), ("KSFO", 0)]
+    assert set(response.json()[0]) == set(schemas.StatusSummary.model_fields)
+
+    response = client.get("/api/v1/status/summary", params={'facility_id': "KSFO"})
+    assert [r['facility_id'] for r in response.json()] == ["KSFO"]
+
+def test_read_status_batch(client, db_session):
+    start = datetime.datetime(2025, 12, 17, 14, 0)
+    db_session.add_all([
+        StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=start + datetime.timedelta(hours=i))
+        for i in range(3)
+    ] + [StatusReport(facility_id="KSFO", status_type="RUNWAY", start_time=start)])
+    db_session.commit()
+
+    response = client.get("/api/v1/status/batch", params={'ids': "4,1,99", 'fields': "facility_id"})
+    assert response.status_code == 200
+    assert response.json() == {'reports': {
+        '4': {'facility_id': "KSFO", 'report_id': 4},
+        '1': {'facility_id': "KDEN", 'report_id': 1},
+        '99': None,
+    }}
+    assert response.headers['etag']
+
+    response = client.get("/api/v1/status/batch",
+                          params={'facility_ids': ["KDEN", "KXXX"], 'per_facility': 2, 'fields': "status_type"})
+    assert response.json() == {'facilities': {
+        'KDEN': [{'status_type': "RUNWAY", 'report_id': 1}, {'status_type': "RUNWAY", 'report_id': 2}],
+        'KXXX': [],
+    }}
+
+    response = client.post("/api/v1/status/batch", json={'ids': [2], 'facility_ids': ["KSFO"]})
+    body = response.json()
+    assert body['reports']['2']['start_time'] == "2025-12-17T15:00:00"
+    assert [r['report_id'] for r in body['facilities']['KSFO']] == [4]
+
+    assert client.get("/api/v1/status/batch").status_code == 400
+    assert client.get("/api/v1/status/batch", params={'ids': "1,x"}).status_code == 400
+    assert client.post("/api/v1/status/batch", json={'ids': list(range(501))}).status_code == 400
+    assert client.post("/api/v1/status/batch", json={'ids': [1], 'per_facility': 0}).status_code == 422
+
+def test_read_active_status_reports(client, db_session):
+    start = datetime.datetime(2025, 12, 17, 14, 0)
+    hour = datetime.timedelta(hours=1)
+    db_session.add_all([
+        StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=start, end_time=start + 2 * hour),
+        StatusReport(facility_id="KDEN", status_type="TAXIWAY", start_time=start + 3 * hour, end_time=None),
+        StatusReport(facility_id="KDEN", status_type="ILS", start_time=start - 5 * hour, end_time=start - hour),
+        StatusReport(facility_id="KSFO", status_type="RUNWAY", start_time=start, end_time=None),
+    ])
+    db_session.commit()
+
+    def ids(**params):
+        response = client.get("/api/v1/status/active", params={'fields': "report_id", **params})
+        assert response.status_code == 200
+        return [r['report_id'] for r in response.json()]
+
+    assert ids(at="2025-12-17T15:00:00Z") == [1, 4]
+    # End times are exclusive
+    assert ids(at="2025-12-17T16:00:00Z") == [4]
+    assert ids(facility_id="KDEN", **{'from': "2025-12-17T14:00:00Z", 'to': "2025-12-17T18:00:00Z"}) == [1, 2]
+    assert ids(**{'from': "2025-12-17T13:00:00Z"}) == [1, 2, 4]
+    assert ids(to="2025-12-17T10:00:00Z") == [3]
+    # Without a time, what is active now: the open-ended reports
+    assert ids() == [2, 4]
+
+    assert client.get("/api/v1/status/active", params={'at': "2025-12-17T15:00:00Z",
+                                                      'from': "2025-12-17T14:00:00Z"}).status_code == 400
+    assert client.get("/api/v1/status/active", params={'from': "2025-12-17T18:00:00Z",
+                                                      'to': "2025-12-17T14:00:00Z"}).status_code == 400
+
+def test_interval_predicates_use_the_range_column_on_postgresql():
+    from sqlalchemy import select
+    from sqlalchemy.dialects import postgresql
+    from common.intervals import active_at, overlaps
+
+    at = datetime.datetime(2025, 12, 17, 14, 0, tzinfo=datetime.timezone.utc)
+    sql = str(select(StatusReport.report_id).where(active_at(at), overlaps(at, None))
+              .compile(dialect=postgresql.dialect()))
+    assert "status_report.validity @>" in sql
+    assert "status_report.validity && tstzrange(" in sql
+    # Bounded on the partition key, so later months are pruned
+    assert "status_report.start_time <= %(param_1)s" in sql
+
+    sql = str(select(StatusReport.report_id).where(overlaps(None, at)).compile(dialect=postgresql.dialect()))
+    assert "status_report.start_time < %(param_1)s" in sql
+
+def test_search_status_reports(client, db_session):
+    start = datetime.datetime(2025, 12, 17, 14, 0)
+    texts = ["ILS RWY 28R INOP.", "RWY 17L/35R CLSD due to WIP MOWING.", "TWY B CLSD WIP.",
+             "OBST CRANE 120FT AGL.", "ils rwy 10 unserviceable", "Discount 50% WIP_2"]
+    db_session.add_all([
+        StatusReport(facility_id="KDEN" if i % 2 else "KSFO", status_type="RUNWAY",
+                     start_time=start + datetime.timedelta(hours=i), raw_notam_text=text)
+        for i, text in enumerate(texts)
+    ])
+    db_session.commit()
+
+    def search(**params):
+        response = client.get("/api/v1/status/search", params={'fields': "report_id", **params})
+        assert response.status_code == 200
+        return [r['report_id'] for r in response.json()], response.headers
+
+    assert search(q="ils")[0] == [1, 5]
+    assert search(q="WIP CLSD")[0] == [2, 3]
+    assert search(q="WIP -TWY")[0] == [2, 6]
+    assert search(q="WIP", facility_id="KDEN")[0] == [2, 6]
+    # LIKE wildcards in the query are matched literally
+    assert search(q="50%")[0] == [6]
+
+    first, headers = search(q="RWY", limit=2)
+    assert first == [1, 2]
+    second, headers = search(q="RWY", limit=2, cursor=headers['x-next-cursor'])
+    assert second == [5] and 'x-next-cursor' not in headers
+
+    assert client.get("/api/v1/status/search").status_code == 422
+    assert client.get("/api/v1/status/search", params={'q': "RWY", 'cursor': "bad"}).status_code == 400
+
+def test_search_predicates_use_the_tsvector_on_postgresql():
+    from sqlalchemy import select
+    from sqlalchemy.dialects import postgresql
+    from common.search import text_match, text_rank
+
+    sql = str(select(text_rank("wip").label('rank')).where(text_match("wip"))
+              .compile(dialect=postgresql.dialect()))
+    assert "ts_rank(status_report.search_vector, websearch_to_tsquery(" in sql
+    assert "status_report.search_vector @@ websearch_to_tsquery(" in sql
+
+def test_read_metrics(client, db_session):
+    db_session.add(StatusReport(facility_id="KDEN", status_type="RUNWAY", raw_notam_text="RWY CLSD"))
+    db_session.commit()
+    client.get("/api/v1/status/1")
+    client.get("/api/v1/status/999")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'text/plain; version=0.0.4; charset=utf-8'
+    body = response.text
+    # Labelled by route template, not by the requested path
+    assert 'http_requests_total{method="GET",route="/api/v1/status/{report_id}",status="200"}' in body
+    assert 'http_requests_total{method="GET",route="/api/v1/status/{report_id}",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/status/{report_id}",le="+Inf"}' in body
+    # Queries go to the test database here, only the startup schema creation used the API's engine
+    assert 'db_statement_duration_seconds_count{engine="api_async",' in body
+    assert 'db_pool_checkouts_total{engine="api_async"}' in body
+    assert '/api/v1/status/999' not in body
@@ -0,0 +1,100 @@
+import urllib.request
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from common import metrics
+from common.database import DB_STATEMENT_SECONDS, statement_labels, time_statements
+
+def test_render_counters_gauges_and_histograms():
+    registry = metrics.Registry()
+    requests = metrics.Counter('test_requests_total', "Requests", ('route',), registry=registry)
+    depth = metrics.Gauge('test_depth', "Queue depth", registry=registry)
+    latency = metrics.Histogram('test_seconds', "Latency", ('route',), buckets=(0.1, 1), registry=registry)
+
+    requests.inc(route='/a')
+    requests.inc(2, route='/b "quoted"')
+    depth.set(3)
+    for value in (0.05, 0.1, 0.5, 7):
+        latency.observe(value, route='/a')
+
+    assert registry.render().splitlines() == [
+        '# HELP test_requests_total Requests',
+        '# TYPE test_requests_total counter',
+        'test_requests_total{route="/a"} 1',
+        'test_requests_total{route="/b \\"quoted\\""} 2',
+        '# HELP test_depth Queue depth',
+        '# TYPE test_depth gauge',
+        'test_depth 3',
+        '# HELP test_seconds Latency',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_seconds_bucket{route="/a",le="1"} 3',
+        'test_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_seconds_sum{route="/a"} 7.65',
+        'test_seconds_count{route="/a"} 4',
+    ]
+    assert latency.get(route='/a') == (4, pytest.approx(7.65))
+
+    with pytest.raises(ValueError):
+        requests.inc(path='/a')
+    with pytest.raises(ValueError):
+        metrics.Gauge('test_depth', "Registered twice", registry=registry)
+
+def test_callback_and_stage_timer():
+    registry = metrics.Registry()
+    metrics.Callback('test_hits_total', "Hits", 'counter', lambda: {('api',): 5, ('worker',): None},
+                     ('engine',), registry=registry)
+    stages = metrics.Histogram('test_stage_seconds', "Stages", ('stage',), registry=registry)
+
+    timer = metrics.StageTimer(stages)
+    assert list(timer.iterate('parse', iter([1, 2, 3]))) == [1, 2, 3]
+    with timer.stage('flush'):
+        pass
+    with timer.stage('flush'):
+        pass
+    timer.observe()
+
+    output = registry.render()
+    # Callbacks leave out label sets without a value
+    assert 'test_hits_total{engine="api"} 5\n' in output and 'worker' not in output
+    # Each stage is observed once per run, however often it was entered
+    assert stages.get(stage='parse')[0] == stages.get(stage='flush')[0] == 1
+
+def test_textfile_and_http_exports(tmp_path):
+    registry = metrics.Registry()
+    metrics.Counter('test_runs_total', "Runs", registry=registry).inc()
+
+    path = tmp_path / 'worker.prom'
+    metrics.write_textfile(str(path), registry)
+    assert path.read_text() == registry.render()
+    assert [p.name for p in tmp_path.iterdir()] == ['worker.prom']
+
+    server = metrics.start_http_server(0, registry=registry)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+            assert response.headers['Content-Type'] == metrics.CONTENT_TYPE
+            assert b'test_runs_total 1\n' in response.read()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_statement_timings(tmp_path):
+    assert statement_labels('SELECT status_report.report_id FROM status_report WHERE 1') == ('select', 'status_report')
+    assert statement_labels('INSERT INTO status_summary (facility_id) VALUES (?)') == ('insert', 'status_summary')
+    assert statement_labels('SELECT relname FROM pg_class') == ('select', 'other')
+    assert statement_labels('PRAGMA main.table_info("x")') == ('other', 'other')
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'statements.db'}")
+    time_statements('test_statements', engine)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE status_report (report_id INTEGER)"))
+        conn.execute(text("SELECT report_id FROM status_report"))
+        conn.execute(text("SELECT report_id FROM status_report"))
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT missing FROM status_report"))
+        assert not conn.info['statement_start']
+
+    assert DB_STATEMENT_SECONDS.get(engine='test_statements', operation='select', table='status_report')[0] == 2
+    assert 'db_statement_errors_total{engine="test_statements",operation="select",table="status_report"} 1' \
+        in metrics.render()
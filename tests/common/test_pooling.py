@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from common.pooling import (
+    pool_settings,
+    engine_options,
+    instrument,
+    pool_status,
+    InstrumentedQueuePool,
+    InstrumentedAsyncQueuePool
+)
+
+def test_pool_settings_profiles_and_overrides():
+    assert pool_settings('api', environ={})['statement_timeout_ms'] == 5000
+    assert pool_settings('worker', environ={})['max_overflow'] == 0
+
+    environ = {'DB_POOL_SIZE': '7', 'WORKER_DB_POOL_SIZE': '3', 'API_DB_POOL_PRE_PING': 'false'}
+    assert pool_settings('api', environ=environ)['pool_size'] == 7
+    assert pool_settings('api', environ=environ)['pool_pre_ping'] is False
+    assert pool_settings('worker', environ=environ)['pool_size'] == 3
+
+    with pytest.raises(ValueError):
+        pool_settings('batch', environ={})
+
+def test_engine_options_only_tune_postgresql():
+    settings = pool_settings('api', environ={'API_DB_STATEMENT_TIMEOUT_MS': '250'})
+    assert engine_options('sqlite:///flos.db', settings) == {}
+
+    options = engine_options('postgresql://user@db/flos_db', settings)
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert options['connect_args'] == {'options': '-c statement_timeout=250'}
+
+    options = engine_options('postgresql://user@db/flos_db', settings, is_async=True)
+    assert options['poolclass'] is InstrumentedAsyncQueuePool
+    assert options['connect_args'] == {'server_settings': {'statement_timeout': '250'}}
+
+    settings['statement_timeout_ms'] = 0
+    assert 'connect_args' not in engine_options('postgresql://user@db/flos_db', settings)
+
+def test_instrumented_pool_records_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05, pool_logging_name='test_pool'
+    )
+    stats = instrument('test_pool', engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        status = pool_status()['test_pool']
+        assert status['checked_out'] == 1
+        # The only connection is in use, so the next checkout waits and times out
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    status = pool_status()['test_pool']
+    assert status['checked_out'] == 0
+    assert status['checkouts'] == status['checkins'] == 1
+    assert status['connects'] == 1 and status['connect_ms_avg'] is not None
+    assert status['timeouts'] == 1
+    assert status['wait_ms_max'] >= 50
+    engine.dispose()
+    assert stats.checkouts == 1
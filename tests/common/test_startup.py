@@ -0,0 +1,13 @@
+import statistics
+
+import pytest
+
+from benchmarks.bench_startup import STARTUP_BUDGETS, DEFERRED_MODULES, measure
+
+@pytest.mark.parametrize("module", sorted(STARTUP_BUDGETS))
+def test_cold_import_stays_within_budget(module):
+    # The median like the benchmark, over three runs so one slow cold start does not fail it
+    runs = [measure(module, DEFERRED_MODULES[module]) for _ in range(3)]
+    assert statistics.median(seconds for seconds, _ in runs) <= STARTUP_BUDGETS[module]
+    # Imported against an unreachable database, without loading drivers or pandas
+    assert all(loaded == [] for _, loaded in runs)
@@ -1,9 +1,11 @@
 import sys
 import os
+import tempfile
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 # Add project root to sys.path to allow imports from api, worker, common
@@ -18,17 +20,22 @@ if "DATABASE_URL" not in os.environ:
 # We need to import models and main after adding project_root to path
 from common.models import Base, StatusReport
 from api.app.main import app, get_db
+from api.app.caching import response_cache
 
-# Use in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# SQLite file shared by the sync session (seeding, worker) and the API's async session
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="flos-tests-"), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DB_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Each TestClient runs its own event loop, so async connections are not pooled across tests
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 @pytest.fixture(scope="function")
 def db_session():
     """
@@ -49,13 +56,13 @@ def client(db_session):
     """
     FastAPI TestClient with overridden database dependency.
     """
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass # Session is closed in the fixture above
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Every test starts from an empty table, so versions can repeat across tests
+    response_cache.clear()
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
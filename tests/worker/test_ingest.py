@@ -0,0 +1,217 @@
+import datetime
+import os
+import shutil
+from unittest.mock import patch
+
+from sqlalchemy import select
+
+from common.models import StatusReport, IngestCheckpoint
+from common.notifications import ChangeSet, decode_change
+from worker.checkpoints import LastRun, plan_file
+from worker.worker_job import upsert_records, ingest_data, DATA_DIR, OUTAGE_SOURCE
+from tests.conftest import TestingSessionLocal
+
+START = datetime.datetime(2025, 12, 17, 14, 0, tzinfo=datetime.timezone.utc)
+
+def make_record(facility_id="KDEN", end_hour=16, text="RWY CLSD"):
+    return {
+        'facility_id': facility_id,
+        'status_type': "RUNWAY",
+        'start_time': START,
+        'end_time': START.replace(hour=end_hour),
+        'raw_notam_text': text
+    }
+
+def test_upsert_records_inserts_and_updates(db_session):
+    added, updated, unchanged = upsert_records(db_session, [make_record("KDEN"), make_record("KSFO")])
+    db_session.commit()
+    assert (added, updated, unchanged) == (2, 0, 0)
+
+    added, updated, unchanged = upsert_records(
+        db_session, [make_record("KDEN", end_hour=18, text="RWY CLSD WIP"), make_record("KSFO"), make_record("KORD")]
+    )
+    db_session.commit()
+    assert (added, updated, unchanged) == (1, 1, 1)
+
+    reports = db_session.execute(select(StatusReport).order_by(StatusReport.report_id)).scalars().all()
+    assert [r.facility_id for r in reports] == ["KDEN", "KSFO", "KORD"]
+    assert reports[0].raw_notam_text == "RWY CLSD WIP"
+    assert reports[0].end_time.hour == 18
+
+def test_upsert_records_collects_changes(db_session):
+    upsert_records(db_session, [make_record("KDEN"), make_record("KSFO")])
+    db_session.commit()
+
+    changes = ChangeSet()
+    upsert_records(db_session, [make_record("KDEN", text="RWY OPEN"), make_record("KSFO"), make_record("KORD")],
+                   changes=changes)
+    assert changes.ids == {"KDEN": [1], "KORD": [3]}
+    assert [decode_change(p) for p in changes.payloads()] == [
+        {'facility_id': "KDEN", 'report_ids': [1]}, {'facility_id': "KORD", 'report_ids': [3]}
+    ]
+
+def test_change_set_payloads_are_bounded():
+    changes = ChangeSet(max_ids=5000)
+    for report_id in range(3000):
+        changes.add(10 ** 12 + report_id, "KDEN")
+    payloads = list(changes.payloads())
+    assert len(payloads) > 1 and all(len(p) < 8000 for p in payloads)
+    assert [i for p in payloads for i in decode_change(p)['report_ids']] == list(range(10 ** 12, 10 ** 12 + 3000))
+
+    # Past max_ids only the facilities are announced
+    for report_id in range(3000):
+        changes.add(report_id, "KSFO")
+    assert [decode_change(p) for p in changes.payloads()] == [
+        {'facility_id': "KDEN", 'report_ids': None}, {'facility_id': "KSFO", 'report_ids': None}
+    ]
+
+def test_upsert_records_batches_and_dedupes(db_session):
+    records = [make_record(f"K{i:03d}") for i in range(25)]
+    # Same natural key twice in one batch, last one wins
+    records.append(make_record("K000", text="LATEST"))
+
+    added, updated, unchanged = upsert_records(db_session, records, batch_size=10)
+    db_session.commit()
+
+    assert added == 25
+    assert db_session.query(StatusReport).count() == 25
+    report = db_session.query(StatusReport).filter(StatusReport.facility_id == "K000").one()
+    assert report.raw_notam_text == "LATEST"
+
+def test_ingest_data_is_idempotent(db_session):
+    with patch("worker.worker_job.SessionLocal", TestingSessionLocal):
+        first = ingest_data()
+        second = ingest_data(batch_size=2, force=True)
+
+    assert first['added'] > 0
+    assert first['updated'] == 0
+    assert second == {'added': 0, 'updated': 0, 'unchanged': first['added'], 'skipped': False}
+    assert db_session.query(StatusReport).count() == first['added']
+
+def test_upsert_records_skips_unchanged_rows(db_session):
+    upsert_records(db_session, [make_record("KDEN")])
+    db_session.commit()
+    report = db_session.query(StatusReport).one()
+    report.last_updated = START
+    db_session.commit()
+
+    assert upsert_records(db_session, [make_record("KDEN")]) == (0, 0, 1)
+    db_session.commit()
+    db_session.refresh(report)
+    assert report.last_updated.replace(tzinfo=datetime.timezone.utc) == START
+
+    assert upsert_records(db_session, [make_record("KDEN", text="RWY OPEN")]) == (0, 1, 0)
+    db_session.commit()
+    db_session.refresh(report)
+    assert report.raw_notam_text == "RWY OPEN"
+
+def test_ingest_data_parallel_matches_sequential(db_session):
+    with patch("worker.worker_job.SessionLocal", TestingSessionLocal):
+        parallel = ingest_data(workers=2)
+    rows = db_session.execute(
+        select(StatusReport.facility_id, StatusReport.status_type, StatusReport.start_time,
+               StatusReport.end_time, StatusReport.raw_notam_text).order_by(StatusReport.report_id)
+    ).all()
+
+    db_session.query(StatusReport).delete()
+    db_session.commit()
+    with patch("worker.worker_job.SessionLocal", TestingSessionLocal):
+        sequential = ingest_data(force=True, workers=1)
+
+    assert parallel == sequential
+    assert db_session.execute(
+        select(StatusReport.facility_id, StatusReport.status_type, StatusReport.start_time,
+               StatusReport.end_time, StatusReport.raw_notam_text).order_by(StatusReport.report_id)
+    ).all() == rows
+
+def test_ingest_data_skips_unchanged_sources_and_resumes_appended_csv(db_session, tmp_path):
+    shutil.copy(os.path.join(DATA_DIR, 'runway_data.json'), tmp_path)
+    shutil.copy(os.path.join(DATA_DIR, 'outage_log.csv'), tmp_path)
+    outage_file = tmp_path / 'outage_log.csv'
+
+    with patch("worker.worker_job.SessionLocal", TestingSessionLocal):
+        first = ingest_data(data_dir=str(tmp_path))
+        second = ingest_data(data_dir=str(tmp_path))
+
+        # Appending one outage only parses the new line
+        with open(outage_file, 'a') as f:
+            f.write("\nZDV,Ops,POWER,UPS on battery,12/19/25 06:00,12/19/25 09:00\n")
+        with patch("worker.worker_job.process_text_notams") as notams:
+            third = ingest_data(data_dir=str(tmp_path))
+
+    assert first['added'] > 0 and not first['skipped']
+    assert second == {'added': 0, 'updated': 0, 'unchanged': 0, 'skipped': True}
+    # The sample log has no trailing newline, so its last line is parsed again
+    assert third == {'added': 1, 'updated': 0, 'unchanged': 1, 'skipped': False}
+    notams.assert_not_called()
+
+    checkpoint = db_session.get(IngestCheckpoint, OUTAGE_SOURCE)
+    assert checkpoint.size == outage_file.stat().st_size
+    assert checkpoint.byte_offset == checkpoint.size
+
+def test_plan_file_detects_touch_append_and_rewrite(tmp_path):
+    path = tmp_path / 'outage_log.csv'
+    path.write_bytes(b"HEADER\nrow 1\nrow 2")
+    first = plan_file(None, OUTAGE_SOURCE, str(path), append_only=True)
+    assert first.changed and first.resume_offset == 0
+    # Partial last line is not counted as parsed
+    assert first.byte_offset == len(b"HEADER\nrow 1\n")
+
+    checkpoint = IngestCheckpoint(
+        source=OUTAGE_SOURCE, path=str(path), size=first.size, mtime_ns=first.mtime_ns,
+        digest=first.digest, byte_offset=first.byte_offset
+    )
+    assert not plan_file(checkpoint, OUTAGE_SOURCE, str(path), append_only=True).changed
+
+    os.utime(path, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+    touched = plan_file(checkpoint, OUTAGE_SOURCE, str(path), append_only=True)
+    assert not touched.changed and touched.touched
+
+    with open(path, 'ab') as f:
+        f.write(b"\nrow 3\n")
+    appended = plan_file(checkpoint, OUTAGE_SOURCE, str(path), append_only=True)
+    assert appended.changed and appended.resume_offset == first.byte_offset
+
+    path.write_bytes(b"HEADER\nrow X\nrow 2\nrow 3\n")
+    rewritten = plan_file(checkpoint, OUTAGE_SOURCE, str(path), append_only=True)
+    assert rewritten.changed and rewritten.resume_offset == 0
+
+def test_ingest_data_records_stage_metrics(db_session):
+    from worker.worker_job import INGEST_STAGE_SECONDS, INGEST_RECORDS, INGEST_RUNS
+
+    runs = INGEST_RUNS.get(result='ok')
+    added = INGEST_RECORDS.get(outcome='added')
+    stages = {stage: INGEST_STAGE_SECONDS.get(stage=stage)[0] for stage in ('lookup', 'parse', 'flush', 'commit')}
+    with patch("worker.worker_job.SessionLocal", TestingSessionLocal):
+        result = ingest_data()
+
+    assert INGEST_RUNS.get(result='ok') == runs + 1
+    assert INGEST_RECORDS.get(outcome='added') == added + result['added']
+    for stage, count in stages.items():
+        assert INGEST_STAGE_SECONDS.get(stage=stage)[0] == count + 1
+
+def test_ingest_data_skips_the_database_while_nothing_moved(db_session, tmp_path):
+    shutil.copy(os.path.join(DATA_DIR, 'runway_data.json'), tmp_path)
+    shutil.copy(os.path.join(DATA_DIR, 'outage_log.csv'), tmp_path)
+    last_run = LastRun()
+
+    with patch("worker.worker_job.SessionLocal", TestingSessionLocal):
+        first = ingest_data(data_dir=str(tmp_path), last_run=last_run)
+    assert first['added'] > 0
+    # Every sample report has started and ended already, no summary row waits on the clock
+    assert last_run.fingerprint is not None and last_run.next_change is None
+
+    with patch("worker.worker_job.SessionLocal", side_effect=AssertionError("opened a session")):
+        idle = ingest_data(data_dir=str(tmp_path), last_run=last_run)
+    assert idle == {'added': 0, 'updated': 0, 'unchanged': 0, 'skipped': True}
+
+    # A touched file, or a summary row going stale, means a real run again
+    os.utime(tmp_path / 'outage_log.csv', ns=(0, 0))
+    with patch("worker.worker_job.SessionLocal", TestingSessionLocal):
+        touched = ingest_data(data_dir=str(tmp_path), last_run=last_run)
+    assert touched['skipped']
+
+    last_run.next_change = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+    with patch("worker.worker_job.SessionLocal", TestingSessionLocal):
+        ingest_data(data_dir=str(tmp_path), last_run=last_run)
+    assert last_run.next_change is None
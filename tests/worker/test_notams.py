@@ -0,0 +1,63 @@
+import datetime
+
+from worker.notams import parse_notam, scan_notam
+from worker.worker_job import parse_notam_effective_time
+from worker.data.unstructured_notams import mock_legacy_notams
+
+UTC = datetime.timezone.utc
+
+def test_parse_notam_header_and_window():
+    notam = parse_notam(mock_legacy_notams[0].strip(), parse_notam_effective_time)
+
+    assert notam['notam_id'] == "12/034"
+    assert notam['series'] == "12"
+    assert notam['number'] == "034"
+    assert notam['location'] == "DEN"
+    assert notam['facility_id'] == "KDEN"
+    assert notam['artcc'] == "ZDV"
+    assert notam['subject'] == "RWY"
+    assert notam['status_type'] == "NOTAM_RUNWAY"
+    assert notam['start_time'] == datetime.datetime(2025, 12, 18, 11, 0, tzinfo=UTC)
+    assert notam['end_time'] == datetime.datetime(2025, 12, 18, 15, 0, tzinfo=UTC)
+    assert notam['end_qualifier'] is None
+
+def test_parse_notam_until_ufn():
+    # The old two-regex parser found no start time here
+    notam = parse_notam(mock_legacy_notams[1].strip(), parse_notam_effective_time)
+
+    assert notam['artcc'] == "ZOA"
+    assert notam['subject'] == "ILS"
+    assert notam['status_type'] == "NOTAM_NAVAID"
+    assert notam['start_time'] == datetime.datetime(2025, 12, 18, 12, 30, tzinfo=UTC)
+    assert notam['end_time'] is None
+    assert notam['end_qualifier'] == "UFN"
+
+def test_parse_notam_perm_ignores_later_keywords():
+    # "LOC:" is a label, and RWY comes after the OBST subject
+    notam = parse_notam(mock_legacy_notams[2].strip(), parse_notam_effective_time)
+
+    assert notam['status_type'] == "NOTAM_OBSTRUCTION"
+    assert notam['end_time'] is None
+    assert notam['end_qualifier'] == "PERM"
+
+def test_parse_notam_icao_items():
+    text = (
+        "A1234/25 NOTAMN\n"
+        "Q) KZDV/QMRLC/IV/NBO/A/000/999/3951N10440W005\n"
+        "A) KDEN B) 2512181100 C) 2512181500 EST\n"
+        "E) TWY B CLSD"
+    )
+    notam = parse_notam(text, parse_notam_effective_time)
+
+    assert notam['facility_id'] == "KDEN"
+    assert notam['status_type'] == "NOTAM_TAXIWAY"
+    assert notam['start_time'] == datetime.datetime(2025, 12, 18, 11, 0, tzinfo=UTC)
+    assert notam['end_time'] == datetime.datetime(2025, 12, 18, 15, 0, tzinfo=UTC)
+    assert notam['end_qualifier'] == "EST"
+
+def test_scan_notam_unknown_subject():
+    fields = scan_notam("!FDC 1/1234 (KSFO) ... EFFECTIVE: 2512171400 TIL 2512181400")
+
+    assert fields['subject'] is None
+    assert fields['artcc'] is None
+    assert (fields['start'], fields['end']) == ("2512171400", "2512181400")
@@ -3,14 +3,19 @@ import datetime
 import pandas as pd
 from unittest.mock import patch, mock_open
 import json
+import io
+from concurrent.futures import ProcessPoolExecutor
 
 from worker.worker_job import (
     parse_iso_datetime,
     parse_csv_datetime,
     parse_notam_effective_time,
     process_runway_json,
+    iter_runway_json,
+    iter_json_array,
     process_outage_csv,
-    process_text_notams
+    process_text_notams,
+    process_text_notams_parallel
 )
 
 # --- Helper Tests ---
@@ -73,6 +78,67 @@ def test_process_runway_json():
     assert "CLOSED - CONSTRUCTION" in item['raw_notam_text']
     assert item['start_time'].year == 2025
 
+def make_runway_item(i):
+    return {
+        "facility_icao": f"K{i:03d}",
+        "report_type": "RUNWAY",
+        "status": "CLOSED",
+        "closure_reason": "",
+        "time_active_utc": "2025-12-17T14:00:00Z",
+        "estimated_reopen_utc": None
+    }
+
+def test_iter_json_array_across_chunk_boundaries():
+    items = [make_runway_item(i) for i in range(50)] + [12345, "x, ]", [1, [2]], None]
+    stream = io.StringIO(" \n" + json.dumps(items, indent=2))
+
+    # A tiny chunk size forces elements and separators to straddle reads
+    assert list(iter_json_array(stream, chunk_size=7)) == items
+    assert list(iter_json_array(io.StringIO("[ ]"))) == []
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('[{"a": 1} {"b": 2}]'), chunk_size=4))
+
+def test_iter_json_array_large_element_in_tiny_chunks():
+    big = {"id": "big", "notes": ["RWY 10/28 CLSD \\ \"WIP\" ]}"] * 2000, "nested": [{"a": [1, {}]}] * 500}
+    items = [1, big, "tail"]
+    text = json.dumps(items)
+    raw_decode = json.JSONDecoder.raw_decode
+
+    # Decoded once more when its closing bracket arrives, not once per chunk
+    with patch.object(json.JSONDecoder, 'raw_decode', autospec=True, side_effect=raw_decode) as decode:
+        assert list(iter_json_array(io.StringIO(text), chunk_size=16)) == items
+    assert decode.call_count < 10
+
+    # A malformed element raises once it is closed, without reading the rest of the file
+    stream = io.StringIO('[{"a": 1 "b": 2}, ' + ", ".join(['{"c": 3}'] * 10000) + ']')
+    with pytest.raises(ValueError):
+        list(iter_json_array(stream, chunk_size=16))
+    assert stream.tell() < 100
+
+    with pytest.raises(ValueError, match="longer than 1000 characters"):
+        list(iter_json_array(io.StringIO(text), chunk_size=16, max_element_size=1000))
+
+def test_iter_runway_json_streams_array_and_ndjson(tmp_path):
+    items = [make_runway_item(i) for i in range(20)]
+    array_path = tmp_path / "runway_data.json"
+    array_path.write_text(json.dumps(items))
+    ndjson_path = tmp_path / "runway_data.ndjson"
+    ndjson_path.write_text("\n".join(json.dumps(item) for item in items) + "\n\n")
+    # NDJSON is also detected from content when the extension does not say so
+    sniffed_path = tmp_path / "runway_feed.json"
+    sniffed_path.write_text(ndjson_path.read_text())
+
+    stream = iter_runway_json(str(array_path), chunk_size=16)
+    assert not isinstance(stream, list)
+    from_array = list(stream)
+
+    assert len(from_array) == 20
+    assert from_array[0]['raw_notam_text'] == "CLOSED"
+    assert from_array[0]['end_time'] is None
+    assert list(iter_runway_json(str(ndjson_path))) == from_array
+    assert list(iter_runway_json(str(sniffed_path))) == from_array
+
 def test_process_outage_csv():
     data = {
         'FACILITY': ['KJFK'],
@@ -91,6 +157,8 @@ def test_process_outage_csv():
     assert item['facility_id'] == "KJFK"
     assert item['status_type'] == "COMM"
     assert item['start_time'].day == 17
+    assert isinstance(item['start_time'], datetime.datetime)
+    assert isinstance(item['end_time'], datetime.datetime)
 
 def test_process_text_notams():
     notams = [
@@ -111,3 +179,34 @@ def test_process_text_notams():
     # Check KLAX
     klax = next(r for r in results if r['facility_id'] == 'KLAX')
     assert klax['end_time'] is None  # PERM
+
+def test_process_outage_csv_filters_and_normalizes_missing_values(tmp_path):
+    csv_path = tmp_path / "outage_log.csv"
+    csv_path.write_text(
+        "FACILITY,SERVICE_AREA,OUTAGE_TYPE,DETAILS,TIME_LOST,EST_REPAIR\n"
+        "ZNY,Comm Room 2,RADAR_DISPLAY,,12/17/25 14:00,\n"
+        ",Tower Cab,VOICE_COMM,Missing facility,12/18/25 08:30,12/18/25 14:00\n"
+        "ZTL,Data Center,NETWORK_FAILURE,Bad start,not a date,12/18/25 10:00\n"
+    )
+
+    results = process_outage_csv(str(csv_path))
+
+    assert results == [{
+        'facility_id': 'ZNY',
+        'status_type': 'RADAR_DISPLAY',
+        'start_time': datetime.datetime(2025, 12, 17, 14, 0, tzinfo=datetime.timezone.utc),
+        'end_time': None,
+        'raw_notam_text': None
+    }]
+
+def test_process_text_notams_parallel_keeps_order():
+    notams = [
+        f"!DEN 12/{i:03d} (K{i:03d}) ZDV\nRWY CLSD.\nEFFECTIVE: 2512181100-2512181500."
+        for i in range(10)
+    ]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        futures = process_text_notams_parallel(notams, pool, chunk_size=3)
+        results = [record for future in futures for record in future.result()]
+
+    assert len(futures) == 4
+    assert results == process_text_notams(notams)
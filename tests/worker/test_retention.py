@@ -0,0 +1,75 @@
+import datetime
+import gzip
+import json
+
+import pytest
+
+from common.models import StatusReport, StatusSummary
+from worker.partitions import ensure_partitions, month_bounds, month_of, partition_name
+from worker.retention import apply_retention, retention_horizon
+from worker.summary import refresh_summary
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+
+def test_month_helpers():
+    assert retention_horizon(NOW, 12) == datetime.datetime(2025, 10, 1, tzinfo=UTC)
+    assert retention_horizon(NOW, 10) == datetime.datetime(2025, 12, 1, tzinfo=UTC)
+    assert month_of(datetime.datetime(2025, 12, 31, 23, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=-2)))) \
+        == (2026, 1)
+    assert month_bounds((2025, 12)) == (datetime.datetime(2025, 12, 1, tzinfo=UTC),
+                                        datetime.datetime(2026, 1, 1, tzinfo=UTC))
+    assert partition_name((2025, 3)) == "status_report_p2025_03"
+
+def test_ensure_partitions_passes_records_through_unpartitioned(db_session):
+    records = [{'start_time': NOW}, {'start_time': NOW}]
+    assert list(ensure_partitions(db_session, iter(records))) == records
+
+def test_apply_retention_archives_expired_rows(db_session, tmp_path):
+    old = datetime.datetime(2025, 3, 10, tzinfo=UTC)
+    db_session.add_all([
+        StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=old, end_time=old + datetime.timedelta(days=1),
+                     raw_notam_text="RWY CLSD"),
+        StatusReport(facility_id="KDEN", status_type="TAXIWAY", start_time=old - datetime.timedelta(days=40),
+                     end_time=old),
+        # Open-ended and still-running reports are kept however old they are
+        StatusReport(facility_id="KDEN", status_type="ILS", start_time=old, end_time=None),
+        StatusReport(facility_id="KSFO", status_type="RUNWAY", start_time=old, end_time=NOW),
+    ])
+    db_session.commit()
+    refresh_summary(db_session, full=True, now=NOW)
+    db_session.commit()
+
+    archived = apply_retention(db_session, now=NOW, months=6, archive_dir=str(tmp_path))
+
+    assert [path.rsplit('/', 1)[-1] for path in archived] == [
+        "status_report_2025_01.ndjson.gz", "status_report_2025_03.ndjson.gz"
+    ]
+    with gzip.open(archived[1], 'rt') as f:
+        rows = [json.loads(line) for line in f]
+    assert [(r['facility_id'], r['status_type'], r['raw_notam_text']) for r in rows] == [("KDEN", "RUNWAY", "RWY CLSD")]
+    assert rows[0]['start_time'] == "2025-03-10T00:00:00+00:00"
+
+    remaining = db_session.query(StatusReport.status_type, StatusReport.facility_id).order_by(StatusReport.report_id)
+    assert [tuple(r) for r in remaining] == [("ILS", "KDEN"), ("RUNWAY", "KSFO")]
+    assert sorted(s.status_type for s in db_session.query(StatusSummary).filter_by(facility_id="KDEN")) == ["ILS"]
+
+    # Nothing left to expire
+    assert apply_retention(db_session, now=NOW, months=6, archive_dir=str(tmp_path)) == []
+
+def test_apply_retention_never_deletes_without_an_archive_dir(db_session, monkeypatch):
+    monkeypatch.setattr("worker.retention.ARCHIVE_DIR", None)
+    monkeypatch.setattr("worker.retention.RETENTION_MODE", None)
+    old = datetime.datetime(2025, 3, 10, tzinfo=UTC)
+    db_session.add(StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=old, end_time=old))
+    db_session.commit()
+
+    # Defaults to detach, which leaves an unpartitioned table alone
+    assert apply_retention(db_session, now=NOW, months=6) == []
+    assert db_session.query(StatusReport).count() == 1
+    with pytest.raises(ValueError):
+        apply_retention(db_session, now=NOW, months=6, mode="archive")
+
+def test_apply_retention_rejects_unknown_mode(db_session, tmp_path):
+    with pytest.raises(ValueError):
+        apply_retention(db_session, now=NOW, archive_dir=str(tmp_path), mode="truncate")
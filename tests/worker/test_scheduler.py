@@ -0,0 +1,61 @@
+from worker.scheduler import Scheduler, snapshot_dir
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        # Callbacks run once the clock reaches their time, e.g. writing a file
+        self.events = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        for event in [e for e in self.events if e[0] <= self.now]:
+            self.events.remove(event)
+            event[1]()
+
+def make_scheduler(tmp_path, results, clock):
+    runs = []
+
+    def job():
+        runs.append(clock.now)
+        return results[min(len(runs), len(results)) - 1]
+
+    scheduler = Scheduler(job, str(tmp_path), poll_interval=0.5, debounce=1, min_interval=10,
+                          max_interval=40, backoff=2, clock=clock, sleep=clock.sleep)
+    return scheduler, runs
+
+def test_scheduler_backs_off_while_idle_and_resets_on_new_data(tmp_path):
+    clock = FakeClock()
+    idle = {'added': 0, 'updated': 0, 'unchanged': 0, 'skipped': True}
+    busy = {'added': 3, 'updated': 0, 'unchanged': 0, 'skipped': False}
+    scheduler, runs = make_scheduler(tmp_path, [idle, idle, idle, idle, busy, idle], clock)
+
+    scheduler.run_forever(max_runs=6)
+
+    # 20s, 40s, capped at 40s, then back to 10s after a run that wrote rows
+    assert [b - a for a, b in zip(runs, runs[1:])] == [20, 40, 40, 40, 10]
+
+def test_scheduler_wakes_on_change_and_coalesces_bursts(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / 'outage_log.csv'
+    path.write_text("HEADER\n")
+    scheduler, runs = make_scheduler(tmp_path, [{'skipped': True}], clock)
+
+    def write(text):
+        def event():
+            with open(path, 'a') as f:
+                f.write(text)
+        return event
+
+    # Three appends within the debounce window make one run
+    clock.events = [(2.0, write("a\n")), (2.5, write("b\n")), (3.0, write("c\n"))]
+    scheduler.run_once('startup')
+    assert scheduler.wait() == 'change'
+    assert clock.now == 4.0
+    assert scheduler.snapshot == snapshot_dir(str(tmp_path))
+
+    # Nothing else changes, so the next wake-up is the (backed off) timer
+    assert scheduler.wait() == 'timer'
+    assert clock.now == 4.0 + scheduler.interval
@@ -0,0 +1,61 @@
+import datetime
+from unittest.mock import patch
+
+from sqlalchemy import func, select
+
+from common.models import StatusReport, StatusSummary
+from worker.summary import refresh_summary
+from worker.worker_job import ingest_data
+from tests.conftest import TestingSessionLocal
+
+START = datetime.datetime(2025, 12, 17, 14, 0, tzinfo=datetime.timezone.utc)
+HOUR = datetime.timedelta(hours=1)
+
+def summary_rows(db):
+    rows = db.execute(
+        select(StatusSummary.facility_id, StatusSummary.status_type, StatusSummary.report_count,
+               StatusSummary.open_count, StatusSummary.active_count)
+        .order_by(StatusSummary.facility_id, StatusSummary.status_type)
+    ).all()
+    return [tuple(row) for row in rows]
+
+def test_refresh_summary_counts_and_expires(db_session):
+    db_session.add_all([
+        StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=START, end_time=START + 2 * HOUR),
+        StatusReport(facility_id="KDEN", status_type="RUNWAY", start_time=START - HOUR, end_time=None),
+        StatusReport(facility_id="KDEN", status_type="TAXIWAY", start_time=START + 3 * HOUR, end_time=None),
+        StatusReport(facility_id="KSFO", status_type="RUNWAY", start_time=START, end_time=START + HOUR),
+    ])
+    db_session.commit()
+
+    assert refresh_summary(db_session, ["KDEN"], now=START) == 1
+    db_session.commit()
+    assert summary_rows(db_session) == [("KDEN", "RUNWAY", 2, 1, 2), ("KDEN", "TAXIWAY", 1, 1, 0)]
+
+    # Nothing changed and nothing expired yet
+    assert refresh_summary(db_session, now=START + HOUR) == 0
+
+    # The runway closure ended at +2h, so KDEN is recomputed without being written to
+    assert refresh_summary(db_session, now=START + 2 * HOUR) == 1
+    db_session.commit()
+    assert summary_rows(db_session)[0] == ("KDEN", "RUNWAY", 2, 1, 1)
+    next_change = db_session.execute(
+        select(StatusSummary.next_change).where(StatusSummary.status_type == "TAXIWAY")
+    ).scalar()
+    assert next_change.replace(tzinfo=datetime.timezone.utc) == START + 3 * HOUR
+
+    assert refresh_summary(db_session, now=START, full=True) == 2
+    db_session.commit()
+    assert ("KSFO", "RUNWAY", 1, 0, 1) in summary_rows(db_session)
+
+def test_ingest_data_keeps_summary_consistent(db_session):
+    with patch("worker.worker_job.SessionLocal", TestingSessionLocal):
+        ingest_data()
+
+    expected = db_session.execute(
+        select(StatusReport.facility_id, StatusReport.status_type, func.count())
+        .group_by(StatusReport.facility_id, StatusReport.status_type)
+        .order_by(StatusReport.facility_id, StatusReport.status_type)
+    ).all()
+    assert expected
+    assert [row[:3] for row in summary_rows(db_session)] == [tuple(row) for row in expected]
@@ -0,0 +1,49 @@
+import datetime
+import random
+from datetime import timezone
+
+from worker.timestamps import (
+    decode_yymmddhhmm,
+    decode_mdy_hm,
+    decode_iso,
+    timestamp_cache_stats,
+    clear_timestamp_caches
+)
+
+def reference(value, fmt):
+    try:
+        return datetime.datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+def test_decoders_match_strptime():
+    rng = random.Random(7)
+    samples = ["2512171400", "6902290000", "6812312359", "2402290930", "2302290930",
+               "2513011200", "2512321200", "2512172400", "2512171460", "25121714a0", "+512171400"]
+    samples += ["".join(rng.choice("0123456789") for _ in range(10)) for _ in range(2000)]
+    for value in samples:
+        assert decode_yymmddhhmm(value) == reference(value, "%y%m%d%H%M"), value
+
+    csv_samples = ["12/17/25 14:00", "02/29/24 09:30", "02/29/23 09:30", "13/01/25 10:00",
+                   "12/17/25 24:00", "1/5/25 9:00", "12-17-25 14:00", "12/17/25 14:00 ", ""]
+    csv_samples += [
+        f"{rng.randrange(15):02d}/{rng.randrange(34):02d}/{rng.randrange(100):02d} "
+        f"{rng.randrange(26):02d}:{rng.randrange(62):02d}"
+        for _ in range(2000)
+    ]
+    for value in csv_samples:
+        assert decode_mdy_hm(value) == reference(value, "%m/%d/%y %H:%M"), value
+
+def test_decode_iso():
+    assert decode_iso("2025-12-17T14:00:00Z") == datetime.datetime(2025, 12, 17, 14, 0, tzinfo=timezone.utc)
+    assert decode_iso("2025-12-17T14:00:00").tzinfo is None
+    assert decode_iso("invalid") is None
+
+def test_timestamp_cache_counts_hits_and_misses():
+    clear_timestamp_caches()
+    for _ in range(3):
+        decode_yymmddhhmm("2512171400")
+    decode_yymmddhhmm("2512171500")
+
+    stats = timestamp_cache_stats()['yymmddhhmm']
+    assert (stats['hits'], stats['misses'], stats['size']) == (2, 2, 2)
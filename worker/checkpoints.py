@@ -0,0 +1,155 @@
+"""
+Per-source ingestion checkpoints.
+
+A checkpoint records what the worker last ingested from a source (size, mtime,
+content digest and the byte offset parsed up to) so the next cycle can skip a
+source that has not changed, or only parse what was appended to it. Within
+one worker process, `LastRun` goes further and skips opening a session at
+all while the files' stat() and the summary's next change are unchanged.
+"""
+import hashlib
+import os
+from datetime import timezone
+
+from common.models import IngestCheckpoint
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+class SourcePlan:
+    """What the worker does with one source this cycle, and the checkpoint to save afterwards."""
+
+    def __init__(self, source, path, digest, size=None, mtime_ns=None, byte_offset=0,
+                 changed=True, resume_offset=0, touched=False):
+        self.source = source
+        self.path = path
+        self.digest = digest
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.byte_offset = byte_offset
+        # False when the checkpoint matches and the source can be skipped
+        self.changed = changed
+        # Byte offset to start parsing from, 0 for a full re-read
+        self.resume_offset = resume_offset
+        # Unchanged content but new stat fields, the checkpoint should still be refreshed
+        self.touched = touched
+
+def scan_file(path, size, prefix_size=None):
+    """
+    Hashes the first `size` bytes of `path` in one pass. Returns
+    (prefix_digest, digest, line_end): the digest of the first `prefix_size`
+    bytes (None when not requested), the digest of all `size` bytes and the
+    offset just after the last newline.
+    """
+    hasher = hashlib.sha256()
+    prefix_digest = None
+    line_end = 0
+    position = 0
+
+    with open(path, 'rb') as f:
+        while position < size:
+            limit = size - position
+            if prefix_size is not None and position < prefix_size:
+                limit = prefix_size - position
+            chunk = f.read(min(HASH_CHUNK_SIZE, limit))
+            if not chunk:
+                break
+
+            hasher.update(chunk)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                line_end = position + newline + 1
+            position += len(chunk)
+
+            if position == prefix_size:
+                prefix_digest = hasher.hexdigest()
+
+    return prefix_digest, hasher.hexdigest(), line_end
+
+def plan_file(checkpoint, source, path, append_only=False):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # Let the parser report the missing file, nothing gets checkpointed
+        return SourcePlan(source, path, digest=None)
+
+    size, mtime_ns = stat.st_size, stat.st_mtime_ns
+    if checkpoint is not None and checkpoint.path != path:
+        checkpoint = None
+
+    if checkpoint is not None and checkpoint.size == size and checkpoint.mtime_ns == mtime_ns:
+        return SourcePlan(source, path, checkpoint.digest, size, mtime_ns, checkpoint.byte_offset, changed=False)
+
+    grown = append_only and checkpoint is not None and size > checkpoint.size
+    prefix_digest, digest, line_end = scan_file(path, size, checkpoint.size if grown else None)
+
+    if checkpoint is not None and digest == checkpoint.digest:
+        # Touched but identical, refresh the stat fields only
+        return SourcePlan(source, path, digest, size, mtime_ns, checkpoint.byte_offset, changed=False, touched=True)
+
+    resume_offset = 0
+    if grown and prefix_digest == checkpoint.digest:
+        resume_offset = checkpoint.byte_offset
+
+    return SourcePlan(source, path, digest, size, mtime_ns, line_end, resume_offset=resume_offset)
+
+def plan_values(checkpoint, source, name, values):
+    """Plans an in-memory source (a list of strings) by digest alone."""
+    hasher = hashlib.sha256()
+    for value in values:
+        hasher.update(value.encode('utf-8'))
+        hasher.update(b'\0')
+    digest = hasher.hexdigest()
+
+    changed = checkpoint is None or checkpoint.digest != digest
+    return SourcePlan(source, name, digest, changed=changed)
+
+def load_checkpoints(db):
+    return {checkpoint.source: checkpoint for checkpoint in db.query(IngestCheckpoint)}
+
+def save_checkpoints(db, plans):
+    for plan in plans:
+        if plan.digest is None:
+            continue
+        db.merge(IngestCheckpoint(
+            source=plan.source,
+            path=plan.path,
+            size=plan.size,
+            mtime_ns=plan.mtime_ns,
+            digest=plan.digest,
+            byte_offset=plan.byte_offset
+        ))
+
+def source_fingerprint(paths):
+    """(path, size, mtime_ns) of each file in `paths`, None for a missing one."""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            fingerprint.append((path, None, None))
+            continue
+        fingerprint.append((path, stat.st_size, stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+class LastRun:
+    """
+    What the previous successful run of this process saw: the source files'
+    fingerprint and the next time a summary row goes stale. While neither
+    has moved, a run has nothing to read or write and can skip the database.
+    """
+
+    def __init__(self):
+        self.fingerprint = None
+        self.next_change = None
+
+    def is_current(self, fingerprint, now):
+        if self.fingerprint is None or fingerprint != self.fingerprint:
+            return False
+        return self.next_change is None or now < self.next_change
+
+    def update(self, fingerprint, next_change):
+        if next_change is not None and next_change.tzinfo is None:
+            # SQLite hands timestamps back naive, they are stored in UTC
+            next_change = next_change.replace(tzinfo=timezone.utc)
+        self.fingerprint = fingerprint
+        self.next_change = next_change
@@ -0,0 +1,112 @@
+"""
+Text NOTAM parsing.
+
+Domestic NOTAMs are read in one left-to-right pass of a single precompiled
+pattern, which picks up the fields in the order they appear:
+
+    !DEN 12/034 (KDEN) ZDV            location, NOTAM id/series, facility, ARTCC
+    RWY 17L/35R CLSD ...              subject keyword -> status_type
+    EFFECTIVE: 2512181100-2512181500  effective window, also "UNTIL", UFN, PERM
+
+Every branch of the domestic pattern starts with '!' or '(', so the regex
+engine can skip straight to candidate positions, and the gap before
+EFFECTIVE: is consumed possessively instead of by a backtracking .*?.
+ICAO-format NOTAMs (A) KDEN B) 2512181100 C) 2512181500 EST) use a second
+pattern, tried only when the domestic one finds no facility.
+"""
+import re
+
+# Subject keywords mapped to status_report.status_type, anything else stays "NOTAM"
+NOTAM_SUBJECTS = {
+    'RWY': 'NOTAM_RUNWAY',
+    'TWY': 'NOTAM_TAXIWAY',
+    'APRON': 'NOTAM_APRON',
+    'AD': 'NOTAM_AERODROME',
+    'ILS': 'NOTAM_NAVAID',
+    'LOC': 'NOTAM_NAVAID',
+    'GS': 'NOTAM_NAVAID',
+    'VOR': 'NOTAM_NAVAID',
+    'VORTAC': 'NOTAM_NAVAID',
+    'DME': 'NOTAM_NAVAID',
+    'NDB': 'NOTAM_NAVAID',
+    'NAV': 'NOTAM_NAVAID',
+    'OBST': 'NOTAM_OBSTRUCTION',
+    'COM': 'NOTAM_COMMUNICATION',
+    'SVC': 'NOTAM_SERVICE',
+    'AIRSPACE': 'NOTAM_AIRSPACE',
+}
+DEFAULT_STATUS_TYPE = 'NOTAM'
+
+# End-of-validity words with no timestamp, the report stays open
+OPEN_ENDED = ('UFN', 'PERM')
+
+SUBJECT_PATTERN = '|'.join(sorted(NOTAM_SUBJECTS, key=len, reverse=True))
+END_PATTERN = r"(?P<end>\d{10}|UFN|PERM)(?:[ \t]*(?P<end_est>EST)\b)?"
+
+DOMESTIC_NOTAM_RE = re.compile(r"""
+    (?:!(?P<location>[A-Z0-9]{3,4})[ \t]+(?P<notam_id>(?P<series>[A-Z]?\d{1,2})/(?P<number>\d{1,4}))[ \t]+\(|\()
+    (?P<facility>[A-Z0-9]{3,4})\)(?:[ \t]+(?P<artcc>Z[A-Z]{2})\b)?
+    (?:\s+(?P<subject>""" + SUBJECT_PATTERN + r""")\b(?!:))?
+    (?:[^E]*+(?:E(?!FFECTIVE:)[^E]*+)*+EFFECTIVE:\s*(?P<start>\d{10})
+        (?:\s*(?:-|UNTIL\b|TIL\b|TO\b)\s*""" + END_PATTERN + r""")?)?
+""", re.VERBOSE | re.DOTALL)
+
+ICAO_NOTAM_RE = re.compile(r"""
+    \bA\)\s*(?P<facility>[A-Z]{4})\b
+    .*?\bB\)\s*(?P<start>\d{10})
+    (?:\s*C\)\s*""" + END_PATTERN + r""")?
+""", re.VERBOSE | re.DOTALL)
+
+# Fallback when the subject is not the first word of the NOTAM body
+SUBJECT_RE = re.compile(r"(?<![A-Z0-9/:])(?:" + SUBJECT_PATTERN + r")\b(?!:)")
+
+FIELD_GROUPS = ('location', 'notam_id', 'series', 'number', 'facility', 'artcc',
+                'subject', 'start', 'end', 'end_est')
+
+def scan_notam(text):
+    """Returns the NOTAM fields found in `text`, None for the missing ones."""
+    match = DOMESTIC_NOTAM_RE.search(text)
+    if match:
+        fields = match.groupdict()
+    else:
+        # The ICAO pattern only has a subset of the groups
+        match = ICAO_NOTAM_RE.search(text)
+        fields = dict.fromkeys(FIELD_GROUPS)
+        if match:
+            fields.update(match.groupdict())
+    if fields['subject'] is None:
+        subject = SUBJECT_RE.search(text, match.end('facility') if match else 0)
+        fields['subject'] = subject.group() if subject else None
+    return fields
+
+def parse_notam(text, parse_time):
+    """
+    Parses one NOTAM into a field dict. `parse_time` converts a YYMMDDHHMM
+    string to a datetime. end_qualifier is UFN/PERM for open-ended NOTAMs
+    and EST for estimated end times, None otherwise.
+    """
+    fields = scan_notam(text)
+
+    start, end, estimated = fields['start'], fields['end'], fields['end_est']
+
+    if end in OPEN_ENDED:
+        end_qualifier = end
+        end_time = None
+    else:
+        end_qualifier = estimated
+        end_time = parse_time(end) if end else None
+
+    subject = fields['subject']
+    return {
+        'notam_id': fields['notam_id'],
+        'series': fields['series'],
+        'number': fields['number'],
+        'location': fields['location'],
+        'facility_id': fields['facility'],
+        'artcc': fields['artcc'],
+        'subject': subject,
+        'status_type': NOTAM_SUBJECTS.get(subject, DEFAULT_STATUS_TYPE),
+        'start_time': parse_time(start) if start else None,
+        'end_time': end_time,
+        'end_qualifier': end_qualifier,
+    }
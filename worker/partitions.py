@@ -0,0 +1,113 @@
+"""
+Monthly range partitions of status_report on PostgreSQL.
+
+The migration turns status_report into a table partitioned by start_time,
+one partition per UTC calendar month named status_report_pYYYY_MM. There is
+no default partition, so a month must exist before rows for it arrive:
+`ensure_partitions()` wraps the ingest's record stream and creates missing
+months on the fly. A new month is created as a standalone table and then
+ATTACHed, which only takes a SHARE UPDATE EXCLUSIVE lock on status_report,
+so API reads and the ingest's own writes are not blocked by it.
+
+Retention detaches expired months and renames them to
+status_report_detached_pYYYY_MM, so a late record for such a month gets a
+fresh, empty partition instead of the old rows back.
+
+On other databases (or before the migration ran) status_report is a plain
+table and all of this is a no-op.
+"""
+import datetime
+import re
+from datetime import timezone
+
+from sqlalchemy import text
+
+PARENT_TABLE = 'status_report'
+PARTITION_NAME = re.compile(r'^status_report_p(\d{4})_(\d{2})$')
+
+def month_of(value):
+    """(year, month) of a datetime in UTC."""
+    value = value.astimezone(timezone.utc) if value.tzinfo else value
+    return value.year, value.month
+
+def next_month(month):
+    year, month = month
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+def month_bounds(month):
+    start = datetime.datetime(*month, 1, tzinfo=timezone.utc)
+    return start, datetime.datetime(*next_month(month), 1, tzinfo=timezone.utc)
+
+def partition_name(month):
+    return f"{PARENT_TABLE}_p{month[0]:04d}_{month[1]:02d}"
+
+def detached_name(db, month):
+    """First free name for a detached partition of `month`, a month can be detached more than once."""
+    base = f"{PARENT_TABLE}_detached_p{month[0]:04d}_{month[1]:02d}"
+    name, suffix = base, 1
+    while table_exists(db, name):
+        suffix += 1
+        name = f"{base}_{suffix}"
+    return name
+
+def table_exists(db, name):
+    return db.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar() is not None
+
+def is_partitioned(db):
+    if db.get_bind().dialect.name != 'postgresql':
+        return False
+    return db.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:name)"), {'name': PARENT_TABLE}
+    ).scalar() or False
+
+def list_partitions(db):
+    """{(year, month): partition name} of the partitions attached to status_report."""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:name)"
+    ), {'name': PARENT_TABLE}).scalars()
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[(int(match.group(1)), int(match.group(2)))] = name
+    return partitions
+
+def create_partition(db, month):
+    name = partition_name(month)
+    start, end = month_bounds(month)
+    if table_exists(db, name):
+        # Attaching it would bring back whatever it holds, e.g. reports retention detached
+        raise ValueError(f"Table {name} exists but is not a partition of {PARENT_TABLE}, rename or drop it")
+    db.execute(text(
+        f"CREATE TABLE {name} "
+        f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING GENERATED)"
+    ))
+    # Lets ATTACH skip scanning the new table for rows outside the bounds
+    db.execute(text(
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds "
+        f"CHECK (start_time IS NOT NULL AND start_time >= '{start.isoformat()}' AND start_time < '{end.isoformat()}')"
+    ))
+    db.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    db.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds"))
+    print(f"Created partition {name}")
+    return name
+
+def ensure_partitions(db, records, known=None):
+    """
+    Yields `records` unchanged, first creating the partition of any month
+    that has none yet. Does nothing unless status_report is partitioned.
+    """
+    if not is_partitioned(db):
+        yield from records
+        return
+    known = set(list_partitions(db) if known is None else known)
+    for record in records:
+        month = month_of(record['start_time'])
+        if month not in known:
+            create_partition(db, month)
+            known.add(month)
+        yield record
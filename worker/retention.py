@@ -0,0 +1,161 @@
+"""
+Retention of expired status reports.
+
+Reports whose window ended more than RETENTION_MONTHS calendar months ago
+leave status_report, in one of two modes:
+
+- archive: they are written to a gzipped NDJSON file per month in
+  ARCHIVE_DIR (status_report_YYYY_MM.ndjson.gz), then removed for good.
+  Partitions are DETACHed and dropped, unpartitioned tables DELETE the rows.
+  Only allowed with WORKER_ARCHIVE_DIR set explicitly: a directory inside
+  the container would lose the archives, the only copy, on the next restart.
+- detach (the default without an archive directory): expired partitions are
+  only DETACHed and kept as standalone tables renamed to
+  status_report_detached_pYYYY_MM, nothing is deleted. An unpartitioned
+  table is left as it is.
+
+A partition still holding an open-ended or unexpired report is kept whole.
+
+The archive file is complete before anything is removed, and removal plus
+the status_summary refresh commit together.
+"""
+import datetime
+import gzip
+import json
+import os
+from datetime import timezone
+
+from sqlalchemy import column, delete, func, select, table, text
+
+from common.models import StatusReport
+from common.versioning import bump_version
+from worker.partitions import PARENT_TABLE, detached_name, is_partitioned, list_partitions, month_bounds, month_of, next_month
+from worker.summary import refresh_summary
+
+RETENTION_MONTHS = int(os.getenv("WORKER_RETENTION_MONTHS", "12"))
+# Durable storage (a mounted volume) for the archives, no default on purpose
+ARCHIVE_DIR = os.getenv("WORKER_ARCHIVE_DIR") or None
+# 'archive' exports then drops old data, 'detach' only detaches old partitions.
+# Unset, 'archive' when ARCHIVE_DIR is configured and 'detach' otherwise
+RETENTION_MODE = os.getenv("WORKER_RETENTION_MODE") or None
+# Seconds between retention passes of the worker loop
+RETENTION_INTERVAL = float(os.getenv("WORKER_RETENTION_INTERVAL", "86400"))
+# Rows fetched per round trip while archiving
+ARCHIVE_BATCH_SIZE = 5000
+
+ARCHIVE_COLUMNS = ('report_id', 'facility_id', 'status_type', 'start_time', 'end_time',
+                   'raw_notam_text', 'content_hash', 'last_updated')
+
+def retention_horizon(now, months=None):
+    """First instant of the month `months` calendar months before `now`'s (UTC)."""
+    months = RETENTION_MONTHS if months is None else months
+    year, month = month_of(now)
+    index = year * 12 + month - 1 - months
+    return datetime.datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+def archive_path(archive_dir, month):
+    return os.path.join(archive_dir, f"{PARENT_TABLE}_{month[0]:04d}_{month[1]:02d}.ndjson.gz")
+
+def encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+    return value
+
+def write_archive(db, query, path):
+    """Streams the rows of `query` into a gzipped NDJSON file, returns the row count."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + '.partial'
+    count = 0
+    result = db.execute(query.execution_options(yield_per=ARCHIVE_BATCH_SIZE))
+    with gzip.open(partial, 'wt', encoding='utf-8') as f:
+        for rows in result.partitions():
+            for row in rows:
+                f.write(json.dumps({key: encode_value(value) for key, value in row._mapping.items()}) + '\n')
+                count += 1
+    # Only complete archives get the final name
+    os.replace(partial, path)
+    return count
+
+def expire_partitions(db, horizon, archive_dir, mode):
+    archived = []
+    for month, name in sorted(list_partitions(db).items()):
+        if month_bounds(month)[1] > horizon:
+            continue
+        partition = table(name, *(column(key, StatusReport.__table__.c[key].type) for key in ARCHIVE_COLUMNS))
+        columns = partition.c
+        live = db.execute(
+            select(func.count()).select_from(partition)
+            .where((columns.end_time.is_(None)) | (columns.end_time >= horizon))
+        ).scalar()
+        if live:
+            print(f"Keeping partition {name}: {live} reports still open or unexpired")
+            continue
+
+        facilities = db.execute(select(columns.facility_id).distinct()).scalars().all()
+        if mode == 'archive':
+            rows = write_archive(db, select(*columns), archive_path(archive_dir, month))
+            print(f"Archived {rows} reports of {name} to {archive_path(archive_dir, month)}")
+
+        # DETACH needs an exclusive lock on status_report, do not queue behind long API queries
+        db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if mode == 'archive':
+            db.execute(text(f"DROP TABLE {name}"))
+        else:
+            # Out of the partition names, a late record for the month must not re-attach it
+            kept = detached_name(db, month)
+            db.execute(text(f"ALTER TABLE {name} RENAME TO {kept}"))
+            print(f"Detached partition {name} as {kept}")
+        # Removing a partition fires no trigger on status_report
+        bump_version(db)
+        refresh_summary(db, facilities)
+        db.commit()
+        archived.append(name)
+    return archived
+
+def expire_rows(db, horizon, archive_dir):
+    report = StatusReport
+    expired = (report.end_time.is_not(None), report.end_time < horizon, report.start_time < horizon)
+    oldest = db.execute(select(func.min(report.start_time)).where(*expired)).scalar()
+    if oldest is None:
+        return []
+
+    archived = []
+    month = month_of(oldest)
+    while month_bounds(month)[0] < horizon:
+        start, end = month_bounds(month)
+        window = (*expired, report.start_time >= start, report.start_time < end)
+        facilities = db.execute(select(report.facility_id).where(*window).distinct()).scalars().all()
+        if facilities:
+            path = archive_path(archive_dir, month)
+            columns = [report.__table__.c[name] for name in ARCHIVE_COLUMNS]
+            rows = write_archive(db, select(*columns).where(*window).order_by(report.report_id), path)
+            db.execute(delete(report).where(*window))
+            refresh_summary(db, facilities)
+            db.commit()
+            print(f"Archived {rows} reports started in {month[0]:04d}-{month[1]:02d} to {path}")
+            archived.append(path)
+        month = next_month(month)
+    return archived
+
+def apply_retention(db, now=None, months=None, archive_dir=None, mode=None):
+    """
+    Archives and removes (or only detaches) reports that expired before the
+    retention horizon. Returns the partitions (or, unpartitioned, the archive
+    files) handled. Commits after each month.
+    """
+    now = now or datetime.datetime.now(timezone.utc)
+    archive_dir = archive_dir or ARCHIVE_DIR
+    mode = mode or RETENTION_MODE or ('archive' if archive_dir else 'detach')
+    if mode not in ('archive', 'detach'):
+        raise ValueError(f"Unknown retention mode '{mode}'")
+    if mode == 'archive' and not archive_dir:
+        raise ValueError("Retention mode 'archive' deletes expired reports, set WORKER_ARCHIVE_DIR to durable storage")
+
+    horizon = retention_horizon(now, months)
+    if is_partitioned(db):
+        return expire_partitions(db, horizon, archive_dir, mode)
+    if mode == 'detach':
+        # Nothing to detach, and deleting without an archive would lose the rows
+        return []
+    return expire_rows(db, horizon, archive_dir)
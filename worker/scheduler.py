@@ -0,0 +1,105 @@
+"""
+Worker scheduling.
+
+Instead of sleeping a fixed minute between runs, the scheduler polls the
+stat() of the files in the data directory and starts a run as soon as one
+changes. A burst of changes is coalesced into a single run by waiting until
+the directory has been quiet for `debounce` seconds. Without changes, a run
+still happens after `interval` seconds; the interval doubles (up to
+`max_interval`) while runs find nothing new and drops back to
+`min_interval` once they do. Runs execute on the scheduler's own loop, so
+they never overlap.
+"""
+import os
+import time
+
+# Seconds between stat() polls of the data directory
+POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "0.5"))
+# Quiet period that ends a burst of file changes
+DEBOUNCE = float(os.getenv("WORKER_DEBOUNCE", "0.25"))
+# Timer-driven runs happen every MIN_INTERVAL seconds while data is changing,
+# backing off by BACKOFF per idle run up to MAX_INTERVAL
+MIN_INTERVAL = float(os.getenv("WORKER_MIN_INTERVAL", "15"))
+MAX_INTERVAL = float(os.getenv("WORKER_MAX_INTERVAL", "300"))
+BACKOFF = float(os.getenv("WORKER_BACKOFF", "2"))
+
+def snapshot_dir(path):
+    """Returns {file name: (size, mtime_ns)} for the regular files in `path`."""
+    snapshot = {}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return snapshot
+
+def is_idle(result):
+    # A run that skipped every source or wrote nothing
+    return not result or result.get('skipped') or not (result.get('added') or result.get('updated'))
+
+class Scheduler:
+    """Runs `job` whenever `watch_dir` changes, and at least every `max_interval` seconds."""
+
+    def __init__(self, job, watch_dir, poll_interval=None, debounce=None, min_interval=None,
+                 max_interval=None, backoff=None, clock=time.monotonic, sleep=time.sleep):
+        self.job = job
+        self.watch_dir = watch_dir
+        self.poll_interval = poll_interval or POLL_INTERVAL
+        self.debounce = DEBOUNCE if debounce is None else debounce
+        self.min_interval = min_interval or MIN_INTERVAL
+        self.max_interval = max(max_interval or MAX_INTERVAL, self.min_interval)
+        self.backoff = backoff or BACKOFF
+        self.clock = clock
+        self.sleep = sleep
+        self.interval = self.min_interval
+        self.snapshot = snapshot_dir(watch_dir)
+
+    def run_once(self, reason):
+        start = self.clock()
+        result = self.job()
+        elapsed = self.clock() - start
+
+        if is_idle(result):
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        else:
+            self.interval = self.min_interval
+        print(f"Run ({reason}) took {elapsed:.3f}s, next timed run in {self.interval:.0f}s")
+        return result
+
+    def wait(self):
+        """
+        Blocks until the data directory changes (and settles) or the current
+        interval runs out. Returns the reason for the next run.
+        """
+        deadline = self.clock() + self.interval
+        while self.clock() < deadline:
+            self.sleep(min(self.poll_interval, max(deadline - self.clock(), 0)))
+            current = snapshot_dir(self.watch_dir)
+            if current != self.snapshot:
+                self.snapshot = current
+                self.settle()
+                return 'change'
+        return 'timer'
+
+    def settle(self):
+        # Keep polling until a full debounce period passes without another change
+        quiet_since = self.clock()
+        while self.clock() - quiet_since < self.debounce:
+            self.sleep(min(self.poll_interval, self.debounce))
+            current = snapshot_dir(self.watch_dir)
+            if current != self.snapshot:
+                self.snapshot = current
+                quiet_since = self.clock()
+
+    def run_forever(self, max_runs=None):
+        reason = 'startup'
+        runs = 0
+        while max_runs is None or runs < max_runs:
+            self.run_once(reason)
+            runs += 1
+            if max_runs is not None and runs >= max_runs:
+                break
+            reason = self.wait()
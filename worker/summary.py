@@ -0,0 +1,67 @@
+"""
+Incremental maintenance of the status_summary rollup.
+
+At the end of an ingest, the rows of every facility that had reports added
+or updated are recomputed from status_report with one grouped
+INSERT ... SELECT, inside the ingest transaction, so the rollup commits
+together with the rows it counts. active_count depends on the clock as well:
+each summary row records the next instant one of its reports starts or ends,
+and facilities whose next_change has passed are recomputed too.
+"""
+import datetime
+from datetime import timezone
+
+from sqlalchemy import and_, case, delete, func, literal, or_, select
+
+from common.models import StatusReport, StatusSummary
+
+def summary_select(now, facilities=None):
+    """Grouped status_report counts as of `now`, shaped like status_summary rows."""
+    report = StatusReport
+    active = and_(report.start_time <= now, or_(report.end_time.is_(None), report.end_time > now))
+    # When each report next becomes active (start) or stops being active (end)
+    next_change = case((report.start_time > now, report.start_time), (report.end_time > now, report.end_time))
+    query = select(
+        report.facility_id,
+        report.status_type,
+        func.count(),
+        func.count(case((report.end_time.is_(None), 1))),
+        func.count(case((active, 1))),
+        literal(now, StatusSummary.as_of.type),
+        func.min(next_change),
+    ).group_by(report.facility_id, report.status_type)
+    if facilities is not None:
+        query = query.where(report.facility_id.in_(facilities))
+    return query
+
+def refresh_summary(db, facilities=(), now=None, full=False):
+    """
+    Recomputes the summary rows of `facilities` plus those whose next_change
+    has passed (every row with `full`). Returns the number of facilities
+    recomputed. Does not commit.
+    """
+    now = now or datetime.datetime.now(timezone.utc)
+    if full:
+        targets = None
+    else:
+        expired = db.execute(
+            select(StatusSummary.facility_id).where(StatusSummary.next_change <= now).distinct()
+        ).scalars()
+        targets = sorted(set(facilities).union(expired))
+        if not targets:
+            return 0
+
+    columns = ['facility_id', 'status_type', 'report_count', 'open_count', 'active_count', 'as_of', 'next_change']
+    clear = delete(StatusSummary)
+    if targets is not None:
+        clear = clear.where(StatusSummary.facility_id.in_(targets))
+    db.execute(clear)
+    db.execute(StatusSummary.__table__.insert().from_select(columns, summary_select(now, targets)))
+
+    if targets is None:
+        return db.execute(select(func.count(StatusSummary.facility_id.distinct()))).scalar()
+    return len(targets)
+
+def next_summary_change(db):
+    """Earliest next_change over status_summary, None when no row will change with the clock."""
+    return db.execute(select(func.min(StatusSummary.next_change))).scalar()
@@ -0,0 +1,81 @@
+"""
+Timestamp decoding for the worker parsers.
+
+The fixed-width feed formats are decoded by slicing out the integer fields
+instead of going through strptime, and every decoder is memoized in a
+bounded LRU cache: feeds repeat the same timestamps heavily (many outages
+share an hour), so most values are decoded once per process.
+
+Each decoder returns an aware UTC datetime, or None for invalid input.
+"""
+import datetime
+import os
+from datetime import timezone
+from functools import lru_cache
+
+# Distinct values remembered per decoder
+TIMESTAMP_CACHE_SIZE = int(os.getenv("WORKER_TIMESTAMP_CACHE_SIZE", "4096"))
+
+def utc_datetime(year, month, day, hour, minute):
+    try:
+        return datetime.datetime(year, month, day, hour, minute, tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+def expand_year(yy):
+    # Same pivot as strptime's %y: 69-99 -> 1969-1999, 00-68 -> 2000-2068
+    return yy + (1900 if yy >= 69 else 2000)
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def decode_yymmddhhmm(value):
+    """Decodes 'YYMMDDHHMM' (exactly 10 ASCII digits)."""
+    if len(value) != 10 or not (value.isascii() and value.isdigit()):
+        return None
+    return utc_datetime(
+        expand_year(int(value[0:2])), int(value[2:4]), int(value[4:6]),
+        int(value[6:8]), int(value[8:10])
+    )
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def decode_mdy_hm(value):
+    """Decodes 'MM/DD/YY HH:MM', falling back to strptime for non zero-padded values."""
+    digits = value[0:2] + value[3:5] + value[6:8] + value[9:11] + value[12:14]
+    if (len(value) == 14 and value[2] == '/' and value[5] == '/' and value[8] == ' ' and value[11] == ':'
+            and digits.isascii() and digits.isdigit()):
+        return utc_datetime(
+            expand_year(int(value[6:8])), int(value[0:2]), int(value[3:5]),
+            int(value[9:11]), int(value[12:14])
+        )
+    # strptime also accepts forms like "1/5/25 9:00"
+    try:
+        return datetime.datetime.strptime(value, "%m/%d/%y %H:%M").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def decode_iso(value):
+    """Decodes an ISO 8601 string, with a 'Z' suffix meaning UTC. Naive values stay naive."""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+DECODERS = {
+    'yymmddhhmm': decode_yymmddhhmm,
+    'mdy_hm': decode_mdy_hm,
+    'iso': decode_iso,
+}
+
+def timestamp_cache_stats():
+    """Returns {decoder: {'hits', 'misses', 'size'}} for the memoized decoders."""
+    stats = {}
+    for name, decoder in DECODERS.items():
+        info = decoder.cache_info()
+        stats[name] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+    return stats
+
+def clear_timestamp_caches():
+    for decoder in DECODERS.values():
+        decoder.cache_clear()
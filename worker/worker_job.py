@@ -1,13 +1,17 @@
 import sys
 import os
-import time
+import csv
 import json
-import re
 import datetime
+import hashlib
+import itertools
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timezone
-import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
 
 # Add project root and api directory to sys.path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -30,16 +34,81 @@ if os.path.exists(env_path):
                 if key.strip() not in os.environ:
                     os.environ[key.strip()] = value.strip()
 
+# The worker's connection pool settings (common.pooling), unless set explicitly
+os.environ.setdefault("DB_POOL_PROFILE", "worker")
+
 try:
     # Import from common (requires project_root in sys.path)
     from common.models import StatusReport
     from common.database import SessionLocal
+    from common.notifications import STATUS_NOTIFY_CHANNEL, ChangeSet
+    from common import metrics
     # Import from worker (requires project_root in sys.path)
     from worker.data.unstructured_notams import mock_legacy_notams
+    from worker.notams import parse_notam
+    from worker.timestamps import decode_iso, decode_mdy_hm, decode_yymmddhhmm, timestamp_cache_stats
+    from worker.scheduler import Scheduler
+    from worker.checkpoints import LastRun, plan_file, plan_values, load_checkpoints, save_checkpoints, source_fingerprint
+    from worker.summary import next_summary_change, refresh_summary
+    from worker.partitions import ensure_partitions
+    from worker.retention import RETENTION_INTERVAL, apply_retention
 except ImportError as e:
     print(f"Error importing modules: {e}")
     sys.exit(1)
 
+# Number of records sent per INSERT ... ON CONFLICT statement
+BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE", "1000"))
+
+# Parser processes used by ingest_data(), 1 parses the sources one after another in-process
+PARSE_WORKERS = int(os.getenv("WORKER_PARSE_WORKERS", "1"))
+# Text NOTAMs handed to one parser process at a time
+NOTAM_CHUNK_SIZE = int(os.getenv("WORKER_NOTAM_CHUNK_SIZE", "5000"))
+
+# Outage log columns mapped to status_report fields
+OUTAGE_CSV_COLUMNS = ['FACILITY', 'OUTAGE_TYPE', 'DETAILS', 'TIME_LOST', 'EST_REPAIR']
+OUTAGE_CSV_DATETIME_FORMAT = "%m/%d/%y %H:%M"
+RECORD_KEYS = ('facility_id', 'status_type', 'start_time', 'end_time', 'raw_notam_text')
+
+# Characters read per chunk when streaming a JSON array
+JSON_CHUNK_SIZE = 64 * 1024
+# Largest single element of a JSON array, in characters, before the feed is rejected
+JSON_MAX_ELEMENT_SIZE = int(os.getenv("WORKER_JSON_MAX_ELEMENT_SIZE", str(16 * 1024 * 1024)))
+# Characters that can open, close or end an array element, see scan_json_element()
+JSON_ELEMENT_TOKENS = re.compile(r'[\\"{}\[\],]')
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+# Checkpoint names of the worker's sources
+RUNWAY_SOURCE = 'runway_json'
+OUTAGE_SOURCE = 'outage_csv'
+NOTAM_SOURCE = 'legacy_notams'
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Columns identifying a status report across runs (uq_status_report_natural_key)
+NATURAL_KEY = ('facility_id', 'status_type', 'start_time')
+
+# Metrics export of the worker loop: a port (0 disables it, bound to WORKER_METRICS_ADDR)
+# and/or a file rewritten after every run for node_exporter's textfile collector
+METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "0"))
+METRICS_ADDR = os.getenv("WORKER_METRICS_ADDR", "127.0.0.1")
+METRICS_FILE = os.getenv("WORKER_METRICS_FILE", "")
+
+INGEST_STAGE_SECONDS = metrics.Histogram(
+    'worker_ingest_stage_seconds', "Time spent per ingest run in each stage: lookup, parse, flush, summary, commit",
+    ('stage',), buckets=metrics.STAGE_BUCKETS
+)
+INGEST_RUNS = metrics.Counter(
+    'worker_ingest_runs_total', "Ingest runs by result: ok, skipped, idle (no database access) or error", ('result',)
+)
+INGEST_RECORDS = metrics.Counter(
+    'worker_ingest_records_total', "Upserted records by outcome: added, updated or unchanged", ('outcome',)
+)
+INGEST_PARSED = metrics.Counter('worker_ingest_parsed_records_total', "Records parsed per source", ('source',))
+INGEST_SOURCE_ERRORS = metrics.Counter('worker_ingest_source_errors_total', "Sources whose parser failed", ('source',))
+INGEST_LAST_SUCCESS = metrics.Gauge(
+    'worker_ingest_last_success_timestamp_seconds', "Unix time of the last ingest run that did not fail"
+)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -50,208 +119,604 @@ def get_db():
 def parse_iso_datetime(dt_str):
     if not dt_str:
         return None
-    try:
-        # Check if already datetime object (e.g. from pandas)
-        if isinstance(dt_str, datetime.datetime):
-             return dt_str.replace(tzinfo=timezone.utc) if dt_str.tzinfo is None else dt_str
-        
-        # Handle "Z" suffix if present
-        if dt_str.endswith('Z'):
-             dt_str = dt_str[:-1] + '+00:00'
-        return datetime.datetime.fromisoformat(dt_str)
-    except ValueError:
-        return None
+    # Check if already datetime object (e.g. from pandas)
+    if isinstance(dt_str, datetime.datetime):
+         return dt_str.replace(tzinfo=timezone.utc) if dt_str.tzinfo is None else dt_str
+    return decode_iso(dt_str)
 
 def parse_csv_datetime(dt_str):
+    import pandas as pd
+
     if not dt_str or pd.isna(dt_str):
         return None
-    try:
-        # Format "12/17/25 14:00" -> UTC
-        dt = datetime.datetime.strptime(dt_str, "%m/%d/%y %H:%M")
-        return dt.replace(tzinfo=timezone.utc)
-    except ValueError:
-        return None
+    # Format "12/17/25 14:00" -> UTC
+    return decode_mdy_hm(dt_str)
 
 def parse_notam_effective_time(time_str):
     # Format "YYMMDDHHMM"
     if not time_str or len(time_str) < 10:
         return None
-    try:
-        dt = datetime.datetime.strptime(time_str[:10], "%y%m%d%H%M")
-        return dt.replace(tzinfo=timezone.utc)
-    except ValueError:
-        return None
+    return decode_yymmddhhmm(time_str[:10])
+
+def normalize_runway_item(item):
+    facility_id = item.get('facility_icao')
+    status_type = item.get('report_type')
+    
+    # Combine status and closure reason
+    status = item.get('status', '')
+    reason = item.get('closure_reason', '')
+    raw_notam_text = f"{status}"
+    if reason:
+         raw_notam_text += f" - {reason}"
+         
+    start_time = parse_iso_datetime(item.get('time_active_utc'))
+    end_time = parse_iso_datetime(item.get('estimated_reopen_utc'))
+    
+    if facility_id and status_type and start_time:
+        return {
+            'facility_id': facility_id,
+            'status_type': status_type,
+            'start_time': start_time,
+            'end_time': end_time,
+            'raw_notam_text': raw_notam_text
+        }
+    return None
+
+def scan_json_element(text, i, state):
+    """
+    Scans text[i:] for the end of an array element, without decoding it.
+    `state` is [depth, in_string] and carries over between calls. Returns
+    (closed, index): closed once the element's last bracket or the ',' / ']'
+    after it is seen, otherwise index is where to resume after more text.
+    """
+    depth, in_string = state
+    while True:
+        match = JSON_ELEMENT_TOKENS.search(text, i)
+        if match is None:
+            state[:] = depth, in_string
+            # Past the end when the text stops inside an escape
+            return False, max(i, len(text))
+        char, i = match.group(), match.end()
+        if in_string:
+            if char == '\\':
+                i += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth <= 0:
+                return True, i
+        elif depth == 0:
+            return True, i
+
+def iter_json_array(f, chunk_size=None, initial='', max_element_size=None):
+    """
+    Yields the elements of a top-level JSON array one at a time, reading `f` in
+    chunks so only the current element (plus one chunk) is held in memory.
+    `initial` is text already read from `f`. Raises ValueError for malformed
+    JSON or an element longer than `max_element_size` characters.
+    """
+    chunk_size = chunk_size or JSON_CHUNK_SIZE
+    max_element_size = max_element_size or JSON_MAX_ELEMENT_SIZE
+    decoder = json.JSONDecoder()
+    buffer = initial
+    pos = 0
+    eof = False
+
+    def fill():
+        # Drop consumed text and append the next chunk, returns False at end of file
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+        return not eof
+
+    def next_char():
+        # Skips whitespace and returns the next significant character ('' at end of file)
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return ''
+
+    def read_element():
+        # Reads on until the element at pos can be complete. Only the new text is
+        # scanned, re-decoding the whole element after each chunk would be quadratic
+        state, scanned = [0, False], 0
+        while True:
+            closed, index = scan_json_element(buffer, pos + scanned, state)
+            scanned = index - pos
+            if closed:
+                return
+            if len(buffer) - pos > max_element_size:
+                raise ValueError(f"JSON array element longer than {max_element_size} characters")
+            if not fill():
+                return
+
+    if next_char() != '[':
+        raise ValueError("Expected a JSON array")
+    pos += 1
+
+    if next_char() == ']':
+        return
+
+    while True:
+        if not next_char():
+            raise ValueError("Unexpected end of JSON array")
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            # A value ending exactly at the buffer edge may continue in the next chunk
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+
+        if not complete:
+            # Decoded once more when complete: a malformed element raises here
+            # instead of buffering the rest of the file
+            read_element()
+            item, end = decoder.raw_decode(buffer, pos)
+
+        pos = end
+        yield item
+
+        separator = next_char()
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {separator!r}")
+        pos += 1
+
+def iter_ndjson(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def iter_runway_json(file_path, chunk_size=None):
+    """
+    Streams normalized records from a runway feed, either a JSON array or
+    NDJSON (one object per line, detected from the extension or content).
+    """
+    print(f"Streaming JSON: {file_path}")
+    with open(file_path, 'r') as f:
+        if file_path.endswith(NDJSON_EXTENSIONS):
+            items = iter_ndjson(f)
+        else:
+            head = f.read(1)
+            while head and head.isspace():
+                head = f.read(1)
+            # Hand the sniffed character back instead of seeking, so pipes work too
+            if head == '{':
+                items = iter_ndjson(itertools.chain([head + f.readline()], f))
+            else:
+                items = iter_json_array(f, chunk_size, initial=head)
+
+        for item in items:
+            record = normalize_runway_item(item)
+            if record:
+                yield record
 
 def process_runway_json(file_path):
-    print(f"Processing JSON: {file_path}")
     results = []
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            
-        for item in data:
-            facility_id = item.get('facility_icao')
-            status_type = item.get('report_type')
-            
-            # Combine status and closure reason
-            status = item.get('status', '')
-            reason = item.get('closure_reason', '')
-            raw_notam_text = f"{status}"
-            if reason:
-                 raw_notam_text += f" - {reason}"
-                 
-            start_time = parse_iso_datetime(item.get('time_active_utc'))
-            end_time = parse_iso_datetime(item.get('estimated_reopen_utc'))
-            
-            if facility_id and status_type and start_time:
-                results.append({
-                    'facility_id': facility_id,
-                    'status_type': status_type,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'raw_notam_text': raw_notam_text
-                })
+        for record in iter_runway_json(file_path):
+            results.append(record)
     except Exception as e:
         print(f"Error processing JSON: {e}")
-        
+
     return results
 
+def read_outage_csv(file_path, **kwargs):
+    # pandas takes a third of the worker's startup, it is imported by the CSV path only
+    import pandas as pd
+
+    # Only the mapped columns are read, as plain strings (no per-column type inference)
+    return pd.read_csv(
+        file_path,
+        usecols=lambda column: column in OUTAGE_CSV_COLUMNS,
+        dtype=str,
+        **kwargs
+    )
+
+def outage_frame_to_records(df):
+    import pandas as pd
+
+    df = df.reindex(columns=OUTAGE_CSV_COLUMNS)
+
+    # One vectorized parse per column, unparseable values become NaT
+    start_time = pd.to_datetime(df['TIME_LOST'], format=OUTAGE_CSV_DATETIME_FORMAT, utc=True, errors='coerce')
+    end_time = pd.to_datetime(df['EST_REPAIR'], format=OUTAGE_CSV_DATETIME_FORMAT, utc=True, errors='coerce')
+
+    mask = (
+        df['FACILITY'].notna() & (df['FACILITY'] != '') &
+        df['OUTAGE_TYPE'].notna() & (df['OUTAGE_TYPE'] != '') &
+        start_time.notna()
+    )
+
+    columns = [
+        df['FACILITY'][mask],
+        df['OUTAGE_TYPE'][mask],
+        # Kept as Series: .dt.to_pydatetime() returns an ndarray before pandas 3,
+        # and Timestamps already are datetimes
+        start_time[mask],
+        end_time[mask],
+        df['DETAILS'][mask]
+    ]
+    # NaN/NaT -> None so the records match the per-row parser output
+    columns = [column.astype(object).where(column.notna(), None).tolist() for column in columns]
+    return [dict(zip(RECORD_KEYS, values)) for values in zip(*columns)]
+
 def process_outage_csv(file_path):
     print(f"Processing CSV: {file_path}")
     results = []
     try:
-        df = pd.read_csv(file_path)
-        for _, row in df.iterrows():
-            facility_id = row.get('FACILITY')
-            status_type = row.get('OUTAGE_TYPE')
-            raw_notam_text = row.get('DETAILS')
-            
-            start_time = parse_csv_datetime(row.get('TIME_LOST'))
-            end_time = parse_csv_datetime(row.get('EST_REPAIR'))
-            
-            if facility_id and status_type and start_time:
-                results.append({
-                    'facility_id': facility_id,
-                    'status_type': status_type,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'raw_notam_text': raw_notam_text
-                })
+        results = outage_frame_to_records(read_outage_csv(file_path))
     except Exception as e:
         print(f"Error processing CSV: {e}")
         
     return results
 
+def iter_outage_csv(file_path, chunk_rows=None, offset=0):
+    """
+    Streams records from the outage log, parsing `chunk_rows` rows at a time.
+    A non-zero `offset` (the start of a line) skips everything before it, which
+    lets append-only logs resume where the previous run stopped.
+    """
+    from pandas.errors import EmptyDataError
+
+    print(f"Streaming CSV: {file_path}" + (f" from byte {offset}" if offset else ""))
+    with open(file_path, 'rb') as f:
+        options = {}
+        if offset:
+            options['names'] = next(csv.reader([f.readline().decode('utf-8')]))
+            options['header'] = None
+            f.seek(offset)
+
+        try:
+            for chunk in read_outage_csv(f, chunksize=chunk_rows or BATCH_SIZE, **options):
+                yield from outage_frame_to_records(chunk)
+        except EmptyDataError:
+            return
+
 def process_text_notams(notams_list):
     print(f"Processing {len(notams_list)} text NOTAMs")
     results = []
     
-    # Regex patterns
-    facility_pattern = r'\(([A-Z]{3,4})\)'
-    effective_pattern = r'EFFECTIVE:\s*([0-9]{10})-([0-9A-Z]*)'
-    
     for notam_text in notams_list:
         clean_text = notam_text.strip()
+        notam = parse_notam(clean_text, parse_notam_effective_time)
         
-        # Extract Facility
-        fac_match = re.search(facility_pattern, clean_text)
-        facility_id = fac_match.group(1) if fac_match else None
-        
-        # Extract Times
-        start_time = None
-        end_time = None
-        eff_match = re.search(effective_pattern, clean_text)
-        
-        if eff_match:
-            start_str = eff_match.group(1)
-            end_str = eff_match.group(2)
-            
-            start_time = parse_notam_effective_time(start_str)
-            
-            if end_str and end_str.isdigit() and len(end_str) >= 10:
-                end_time = parse_notam_effective_time(end_str)
-            elif end_str in ['UFN', 'PERM']:
-                end_time = None
-        
-        status_type = "NOTAM"
-        
-        if facility_id and start_time:
+        if notam['facility_id'] and notam['start_time']:
              results.append({
-                'facility_id': facility_id,
-                'status_type': status_type,
-                'start_time': start_time,
-                'end_time': end_time,
+                'facility_id': notam['facility_id'],
+                'status_type': notam['status_type'],
+                'start_time': notam['start_time'],
+                'end_time': notam['end_time'],
                 'raw_notam_text': clean_text
             })
             
     return results
 
-def ingest_data():
-    all_records = []
-    
-    # Define file paths
-    # Assuming script is run from project root, but file paths are relative to this script or consistent
+def process_text_notams_parallel(notams_list, pool, chunk_size=None):
+    """
+    Splits `notams_list` into `chunk_size` chunks parsed by `pool`. Returns one
+    future per chunk, in list order.
+    """
+    chunk_size = chunk_size or NOTAM_CHUNK_SIZE
+    return [pool.submit(process_text_notams, chunk) for chunk in batched(notams_list, chunk_size)]
+
+def parse_file_source(source, path, batch_size=None, resume_offset=0):
+    # Runs in a parser process, records are sent back as one list per source
+    if source == RUNWAY_SOURCE:
+        return list(iter_runway_json(path))
+    return list(iter_outage_csv(path, batch_size, resume_offset))
+
+def iter_parallel_sources(pool, plans, batch_size=None, chunk_size=None):
+    """
+    Submits every plan to `pool` up front so the sources are parsed
+    concurrently, then yields (source, records) in plan order. Records keep
+    the order of the sequential parsers, whatever order the processes finish in.
+    """
+    submitted = []
+    for plan in plans:
+        if plan.source == NOTAM_SOURCE:
+            futures = process_text_notams_parallel(mock_legacy_notams, pool, chunk_size)
+        else:
+            futures = [pool.submit(parse_file_source, plan.source, plan.path, batch_size, plan.resume_offset)]
+        submitted.append((plan.source, futures))
+
+    for source, futures in submitted:
+        yield source, (record for future in futures for record in future.result())
+
+def batched(iterable, size):
+    # itertools.batched is only available from Python 3.12
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def dedupe_batch(batch):
+    # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement,
+    # so keep only the last record seen for each natural key
+    unique = {}
+    for record in batch:
+        unique[tuple(record[key] for key in NATURAL_KEY)] = record
+    return list(unique.values())
+
+def record_fingerprint(record):
+    """Hash of the normalized record fields, stored in status_report.content_hash."""
+    parts = []
+    for key in RECORD_KEYS:
+        value = record[key]
+        if isinstance(value, datetime.datetime):
+            value = value.astimezone(timezone.utc).isoformat()
+        parts.append('' if value is None else str(value))
+    return hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+def build_upsert(dialect_name, batch):
+    if dialect_name == 'postgresql':
+        insert = postgresql.insert
+    elif dialect_name == 'sqlite':
+        insert = sqlite.insert
+    else:
+        raise ValueError(f"Bulk upsert is not supported for dialect '{dialect_name}'")
+
+    table = StatusReport.__table__
+    stmt = insert(table).values(batch)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(NATURAL_KEY),
+        set_={
+            'end_time': stmt.excluded.end_time,
+            'raw_notam_text': stmt.excluded.raw_notam_text,
+            'content_hash': stmt.excluded.content_hash,
+            'last_updated': func.now(),
+        },
+        # Rows with the same fingerprint are left alone (no new tuple, no RETURNING row)
+        where=table.c.content_hash.is_distinct_from(stmt.excluded.content_hash)
+    )
+
+    if dialect_name == 'postgresql':
+        # xmax is 0 for freshly inserted tuples and set for rows rewritten by DO UPDATE
+        return stmt.returning(
+            StatusReport.report_id, StatusReport.facility_id, literal_column("(xmax = 0)").label("inserted")
+        )
+    return stmt.returning(StatusReport.report_id, StatusReport.facility_id)
+
+def upsert_records(db, records, batch_size=None, changes=None, timer=None):
+    """
+    Upserts records in batches of `batch_size` with one INSERT ... ON CONFLICT
+    statement per batch. Returns a (added, updated, unchanged) tuple, where
+    unchanged rows matched an existing fingerprint and were not written.
+    Added and updated rows are recorded in the `changes` ChangeSet if given,
+    time spent in the statements as the 'flush' stage of `timer`.
+    Does not commit.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    timer = timer or metrics.StageTimer()
+    dialect_name = db.get_bind().dialect.name
+    count_added = 0
+    count_updated = 0
+    count_unchanged = 0
+
+    for batch in batched(records, batch_size):
+        batch = [dict(record, content_hash=record_fingerprint(record)) for record in dedupe_batch(batch)]
+
+        with timer.stage('flush'):
+            if dialect_name == 'postgresql':
+                rows = db.execute(build_upsert(dialect_name, batch)).all()
+                added = sum(1 for row in rows if row.inserted)
+            else:
+                # SQLite has no xmax, new rows are the ones allocated above the current max id
+                max_id = db.execute(func.max(StatusReport.report_id).select()).scalar() or 0
+                rows = db.execute(build_upsert(dialect_name, batch)).all()
+                added = sum(1 for row in rows if row.report_id > max_id)
+
+        if changes is not None:
+            for row in rows:
+                changes.add(row.report_id, row.facility_id)
+
+        count_added += added
+        count_updated += len(rows) - added
+        count_unchanged += len(batch) - len(rows)
+
+    return count_added, count_updated, count_unchanged
+
+def notify_changes(db, changes):
+    """
+    Queues a NOTIFY per change payload on STATUS_NOTIFY_CHANNEL. PostgreSQL
+    delivers them when the transaction commits and drops them on rollback.
+    Other databases have no NOTIFY, nothing is sent there.
+    """
+    if not changes or db.get_bind().dialect.name != 'postgresql':
+        return 0
+    sent = 0
+    for payload in changes.payloads():
+        db.execute(select(func.pg_notify(STATUS_NOTIFY_CHANNEL, payload)))
+        sent += 1
+    return sent
+
+def guard_source(source, records, failed):
+    # A failing parser is logged and skipped so the other sources still land,
+    # its name is recorded so its checkpoint is not advanced
+    count = 0
+    try:
+        for record in records:
+            count += 1
+            yield record
+    except Exception as e:
+        failed.add(source)
+        INGEST_SOURCE_ERRORS.inc(source=source)
+        print(f"Error processing {source}: {e}")
+    finally:
+        INGEST_PARSED.inc(count, source=source)
+
+def ingest_data(batch_size=None, force=False, data_dir=None, workers=None, last_run=None):
+    """
+    Parses every changed source and upserts the records. Sources whose
+    checkpoint still matches are skipped unless `force` is set. With more than
+    one of `workers`, the sources (and chunks of the NOTAM list) are parsed
+    concurrently in a process pool. The status_summary rows of the facilities
+    that changed are refreshed in the same transaction (all of them with
+    `force`). Returns the added/updated/unchanged counts and whether the whole
+    run was skipped; stage timings and counts go to the worker_ingest_* metrics.
+    With a `last_run` (LastRun) kept across calls, a run that would find the
+    same files and no stale summary row returns as skipped without touching
+    the database.
+    """
     # The requirement says "Reads worker/data/runway_data.json" etc.
     # So we'll construct absolute paths based on this script's location
-    
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(base_dir, 'data')
-    
+    data_dir = data_dir or DATA_DIR
     runway_file = os.path.join(data_dir, 'runway_data.json')
     outage_file = os.path.join(data_dir, 'outage_log.csv')
     
-    # Process inputs
-    all_records.extend(process_runway_json(runway_file))
-    all_records.extend(process_outage_csv(outage_file))
-    all_records.extend(process_text_notams(mock_legacy_notams))
-    
-    print(f"Total records to ingest: {len(all_records)}")
+    batch_size = batch_size or BATCH_SIZE
+    workers = workers or PARSE_WORKERS
+
+    # Taken before reading anything, so a file written during the run makes the next one differ.
+    # The NOTAM list is module data and cannot change within the process
+    fingerprint = source_fingerprint([runway_file, outage_file])
+    if last_run is not None and not force and last_run.is_current(fingerprint, datetime.datetime.now(timezone.utc)):
+        INGEST_RUNS.inc(result='idle')
+        print("Sources unchanged since the last run, skipping database phase")
+        return {'added': 0, 'updated': 0, 'unchanged': 0, 'skipped': True}
     
     db = SessionLocal()
     count_added = 0
     count_updated = 0
+    count_unchanged = 0
+    skipped = False
+    changes = ChangeSet()
+    timer = metrics.StageTimer(INGEST_STAGE_SECONDS)
+    result = 'error'
     
     try:
-        for record in all_records:
-            # Check for existing record
-            stmt = select(StatusReport).where(
-                StatusReport.facility_id == record['facility_id'],
-                StatusReport.status_type == record['status_type'],
-                StatusReport.start_time == record['start_time']
-            )
-            existing = db.execute(stmt).scalar_one_or_none()
-            
-            if existing:
-                # Update
-                existing.end_time = record['end_time']
-                existing.raw_notam_text = record['raw_notam_text']
-                existing.last_updated = datetime.datetime.now(timezone.utc)
-                count_updated += 1
+        # Checkpoints read back and compared against the sources' current state
+        with timer.stage('lookup'):
+            saved = {} if force else load_checkpoints(db)
+            plans = [
+                plan_file(saved.get(RUNWAY_SOURCE), RUNWAY_SOURCE, runway_file),
+                plan_file(saved.get(OUTAGE_SOURCE), OUTAGE_SOURCE, outage_file, append_only=True),
+                plan_values(saved.get(NOTAM_SOURCE), NOTAM_SOURCE, 'worker.data.unstructured_notams', mock_legacy_notams)
+            ]
+        changed = [plan for plan in plans if plan.changed]
+        for plan in plans:
+            if not plan.changed:
+                print(f"Source {plan.source} unchanged since last run, skipping")
+
+        if not changed:
+            skipped = True
+            with timer.stage('summary'):
+                save_checkpoints(db, [plan for plan in plans if plan.touched])
+                # Active counts still move with the clock
+                refresh_summary(db)
+                next_change = next_summary_change(db)
+            with timer.stage('commit'):
+                db.commit()
+            result = 'skipped'
+            if last_run is not None:
+                last_run.update(fingerprint, next_change)
+            print("All sources unchanged, skipping database phase")
+        else:
+            failed = set()
+            if workers > 1:
+                # Parsed sources are held in memory until the upsert reaches them
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    all_records = itertools.chain.from_iterable(
+                        guard_source(source, records, failed)
+                        for source, records in iter_parallel_sources(pool, changed, batch_size)
+                    )
+                    # Parsing here is the wait for the pool's results
+                    all_records = ensure_partitions(db, timer.iterate('parse', all_records))
+                    count_added, count_updated, count_unchanged = upsert_records(db, all_records, batch_size, changes, timer)
             else:
-                # Insert
-                new_report = StatusReport(
-                    facility_id=record['facility_id'],
-                    status_type=record['status_type'],
-                    start_time=record['start_time'],
-                    end_time=record['end_time'],
-                    raw_notam_text=record['raw_notam_text']
+                parsers = {
+                    RUNWAY_SOURCE: lambda plan: iter_runway_json(plan.path),
+                    OUTAGE_SOURCE: lambda plan: iter_outage_csv(plan.path, batch_size, plan.resume_offset),
+                    NOTAM_SOURCE: lambda plan: process_text_notams(mock_legacy_notams)
+                }
+                # Process inputs lazily, upsert_records pulls one batch at a time so
+                # memory stays bounded by batch_size rather than by the feed sizes
+                all_records = itertools.chain.from_iterable(
+                    guard_source(plan.source, parsers[plan.source](plan), failed) for plan in changed
                 )
-                db.add(new_report)
-                count_added += 1
-        
-        db.commit()
-        print(f"Ingestion Complete: {count_added} records added, {count_updated} records updated")
+                all_records = ensure_partitions(db, timer.iterate('parse', all_records))
+                count_added, count_updated, count_unchanged = upsert_records(db, all_records, batch_size, changes, timer)
+            with timer.stage('summary'):
+                save_checkpoints(db, [plan for plan in plans if plan.source not in failed and (plan.changed or plan.touched)])
+                refresh_summary(db, changes.ids, full=force)
+                notify_changes(db, changes)
+                next_change = next_summary_change(db)
+            with timer.stage('commit'):
+                db.commit()
+            result = 'ok'
+            # A failed source has to be read again next time
+            if last_run is not None and not failed:
+                last_run.update(fingerprint, next_change)
+            INGEST_RECORDS.inc(count_added, outcome='added')
+            INGEST_RECORDS.inc(count_updated, outcome='updated')
+            INGEST_RECORDS.inc(count_unchanged, outcome='unchanged')
+            print(f"Total records ingested: {count_added + count_updated + count_unchanged}")
+            print(f"Ingestion Complete: {count_added} records added, {count_updated} records updated, {count_unchanged} records unchanged")
+            for name, stats in timestamp_cache_stats().items():
+                print(f"Timestamp cache {name}: {stats['hits']} hits, {stats['misses']} misses")
         
     except Exception as e:
         db.rollback()
         print(f"Error during database ingestion: {e}")
     finally:
         db.close()
+        timer.observe()
+        INGEST_RUNS.inc(result=result)
+        if result != 'error':
+            INGEST_LAST_SUCCESS.set(time.time())
+
+    return {'added': count_added, 'updated': count_updated, 'unchanged': count_unchanged, 'skipped': skipped}
+
+def run_retention(**kwargs):
+    """Runs apply_retention() in its own session, errors are logged like ingest errors."""
+    db = SessionLocal()
+    try:
+        return apply_retention(db, **kwargs)
+    except Exception as e:
+        db.rollback()
+        print(f"Error during retention: {e}")
+        return []
+    finally:
+        db.close()
 
 if __name__ == "__main__":
     print("Starting Worker Service...")
-    while True:
+
+    next_retention = 0.0
+    last_run = LastRun()
+
+    if METRICS_PORT:
+        metrics.start_http_server(METRICS_PORT, METRICS_ADDR)
+        print(f"Serving metrics on http://{METRICS_ADDR}:{METRICS_PORT}/metrics")
+
+    def job():
+        global next_retention
         print(f"Running ingestion job at {datetime.datetime.now(timezone.utc)}")
-        ingest_data()
-        print("Sleeping for 60 seconds...")
-        time.sleep(60)
+        result = ingest_data(last_run=last_run)
+        if time.monotonic() >= next_retention:
+            run_retention()
+            next_retention = time.monotonic() + RETENTION_INTERVAL
+        if METRICS_FILE:
+            metrics.write_textfile(METRICS_FILE)
+        return result
+
+    Scheduler(job, DATA_DIR).run_forever()